@@ -15,6 +15,7 @@ Endpoints:
 
 from __future__ import annotations
 
+import functools
 import logging
 import os
 import sys
@@ -31,6 +32,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+import pybase64
 from dotenv import load_dotenv
 from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
@@ -53,8 +55,21 @@ from schemas import (
 )
 from schemas.agentic import IterationInfo
 from schemas.config import AI_MODELS, THINKING_BUDGETS
-from utils.ai_logging import extract_base64_data, extract_mime_type, log_contents_images, log_image_inputs
-from utils.sse import format_complete_event, format_error_event, format_progress_event, format_sse_event
+from utils.ai_logging import (
+    extract_base64_data,
+    extract_mime_type,
+    log_contents_images,
+    log_image_inputs,
+    split_data_url,
+)
+from utils.orjson_response import ORJSONResponse
+from utils.sse import (
+    coalesce_sse_events,
+    format_complete_event,
+    format_error_event,
+    format_progress_event,
+    format_sse_event,
+)
 
 # Load environment variables
 load_dotenv()
@@ -72,7 +87,9 @@ def create_sse_response(
     Create a StreamingResponse for Server-Sent Events (SSE).
 
     This helper encapsulates the common SSE response pattern used by
-    streaming endpoints (inpaint, agentic_edit).
+    streaming endpoints (inpaint, agentic_edit). Frames produced in quick
+    succession are coalesced into a single write; complete and error frames
+    are flushed immediately.
 
     Args:
         event_generator: Async generator yielding SSE-formatted event strings.
@@ -81,7 +98,7 @@ def create_sse_response(
         StreamingResponse configured for SSE with appropriate headers.
     """
     return StreamingResponse(
-        event_generator,
+        coalesce_sse_events(event_generator),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache, no-store, must-revalidate",
@@ -264,6 +281,20 @@ def get_gemini_api_key() -> str:
 GeminiApiKey = Annotated[str, Depends(get_gemini_api_key)]
 
 
+@functools.lru_cache(maxsize=4)
+def get_genai_client(api_key: str):
+    """
+    Return a google-genai client for the given API key, reused across requests.
+
+    Creating a client builds its HTTP transport and config, so endpoints share
+    one per key instead of constructing it on every call. Keying on the API
+    key means a rotated GEMINI_API_KEY picks up a fresh client.
+    """
+    from google import genai
+
+    return genai.Client(api_key=api_key)
+
+
 # =============================================================================
 # Health & Info Endpoints
 # =============================================================================
@@ -442,10 +473,9 @@ async def generate_text(
 
     Matches the Express endpoint at POST /api/ai/generate.
     """
-    from google import genai
     from google.genai import types
 
-    client = genai.Client(api_key=api_key)
+    client = get_genai_client(api_key)
 
     try:
         # Build config
@@ -532,7 +562,7 @@ async def generate_text(
 # Image Generation Endpoint (POST /api/images/generate)
 # =============================================================================
 
-# Note: extract_base64_data and extract_mime_type are imported from utils.ai_logging
+# Note: extract_base64_data, extract_mime_type and split_data_url are imported from utils.ai_logging
 
 
 def extract_image_from_response(response) -> str | None:
@@ -545,8 +575,6 @@ def extract_image_from_response(response) -> str | None:
     - Raw bytes (need base64 encoding)
     - Already base64 encoded string (use as-is)
     """
-    import base64
-
     if not response.candidates or len(response.candidates) == 0:
         return None
 
@@ -560,9 +588,10 @@ def extract_image_from_response(response) -> str | None:
             mime_type = part.inline_data.mime_type or "image/png"
             data = part.inline_data.data
 
-            # Handle both raw bytes and base64-encoded strings
-            if isinstance(data, bytes):
-                data = base64.b64encode(data).decode("utf-8")
+            # Handle both raw bytes and base64-encoded strings; raw bytes are
+            # encoded exactly once here, at the response boundary
+            if isinstance(data, (bytes, bytearray)):
+                data = pybase64.b64encode(data).decode("ascii")
 
             return f"data:{mime_type};base64,{data}"
 
@@ -571,26 +600,28 @@ def extract_image_from_response(response) -> str | None:
 
 @app.post(
     "/api/images/generate",
-    response_model=GenerateImageResponse,
+    response_class=ORJSONResponse,
+    responses={200: {"model": GenerateImageResponse}},
 )
 async def generate_image(
     request: GenerateImageRequest,
     api_key: GeminiApiKey,
-) -> GenerateImageResponse:
+) -> ORJSONResponse:
     """
     Image generation/editing endpoint using Gemini.
 
     Matches the Express endpoint at POST /api/images/generate.
     Uses Gemini's imagen model for image generation/editing.
+
+    The body is a GenerateImageResponse-shaped dict returned as an
+    ORJSONResponse, so the large imageData string skips jsonable_encoder.
     """
-    from google import genai
     from google.genai import types
 
-    client = genai.Client(api_key=api_key)
+    client = get_genai_client(api_key)
 
     # Extract base64 data from data URL
-    source_base64 = extract_base64_data(request.sourceImage)
-    source_mime_type = extract_mime_type(request.sourceImage)
+    source_mime_type, source_base64 = split_data_url(request.sourceImage)
 
     # Build edit prompt (same as Express implementation)
     edit_prompt = f"""{request.prompt}
@@ -663,10 +694,7 @@ Make SIGNIFICANT, VISIBLE changes to create the requested modification. The resu
             ),
         }
 
-        return GenerateImageResponse(
-            raw=raw,
-            imageData=image_data,
-        )
+        return ORJSONResponse({"raw": raw, "imageData": image_data})
 
     except HTTPException:
         raise
@@ -791,11 +819,15 @@ async def inpaint(request: InpaintRequest, api_key: GeminiApiKey) -> StreamingRe
 # =============================================================================
 
 
-@app.post("/api/ai/generate-image")
+@app.post(
+    "/api/ai/generate-image",
+    response_class=ORJSONResponse,
+    responses={200: {"model": GenerateImageResponse}},
+)
 async def ai_generate_image(
     request: GenerateImageRequest,
     api_key: GeminiApiKey,
-) -> GenerateImageResponse:
+) -> ORJSONResponse:
     """
     Redirect to /api/images/generate for Express path compatibility.
 
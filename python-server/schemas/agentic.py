@@ -5,9 +5,10 @@ These schemas match the TypeScript interfaces in server/src/types/api.ts
 to ensure API compatibility between Express and Python backends.
 """
 
+from functools import cached_property
 from typing import Annotated, Literal, Optional
 
-from pydantic import AfterValidator, BaseModel, Field
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
 
 # =============================================================================
 # Custom Types
@@ -15,9 +16,17 @@ from pydantic import AfterValidator, BaseModel, Field
 
 
 def validate_data_url(v: str) -> str:
-    """Validate that a string is a data URL starting with 'data:'."""
+    """Validate that a string is a base64 data URL ('data:<mime>;base64,...').
+
+    Only the header before the first comma is inspected. Base64 payloads
+    contain no comma, so a valid URL is checked without scanning its image
+    data, whatever the length of its media-type parameters.
+    """
     if not v.startswith("data:"):
         raise ValueError('Must be a data URL starting with "data:"')
+    comma = v.find(",")
+    if comma == -1 or not v[:comma].endswith(";base64"):
+        raise ValueError('Must be a base64 data URL ("data:<mime>;base64,...")')
     return v
 
 
@@ -128,18 +137,37 @@ ShapeType = Literal["line", "arrow", "rectangle", "ellipse", "freedraw", "text",
 class Point2D(BaseModel):
     """A 2D point coordinate."""
 
+    model_config = ConfigDict(frozen=True)
+
     x: float
     y: float
 
+    @cached_property
+    def fmt(self) -> str:
+        """The point as "(x, y)" with integer coordinates, formatted once."""
+        return f"({int(self.x)}, {int(self.y)})"
+
 
 class BoundingBox(BaseModel):
     """Bounding box for a shape."""
 
+    model_config = ConfigDict(frozen=True)
+
     x: float = Field(..., description="Top-left X coordinate")
     y: float = Field(..., description="Top-left Y coordinate")
     width: float = Field(..., description="Width in pixels")
     height: float = Field(..., description="Height in pixels")
 
+    @cached_property
+    def center(self) -> tuple[float, float]:
+        """The box center as (x, y), computed once."""
+        return (self.x + self.width / 2, self.y + self.height / 2)
+
+    @cached_property
+    def is_square(self) -> bool:
+        """Whether width and height are within 5px, i.e. an ellipse reads as a circle."""
+        return abs(self.width - self.height) < 5
+
 
 class ShapeMetadata(BaseModel):
     """
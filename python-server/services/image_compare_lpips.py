@@ -13,6 +13,7 @@ Coordinate system: (0,0) is top-left, X increases right, Y increases down.
 
 from __future__ import annotations
 
+import contextlib
 import logging
 from dataclasses import dataclass
 from functools import lru_cache
@@ -24,10 +25,14 @@ from scipy.interpolate import griddata
 
 logger = logging.getLogger(__name__)
 
-# Lazy-loaded LPIPS model and torch module
+# Lazy-loaded LPIPS model, torch module and the device the model runs on
 # These are loaded on first use to avoid blocking startup
 _lpips_model = None
 _torch = None
+_device = None
+
+# Number of patch pairs scored per LPIPS forward pass
+_LPIPS_BATCH_SIZE = 64
 
 
 def _get_lpips_model():
@@ -37,15 +42,17 @@ def _get_lpips_model():
     The model is loaded in thread pool via asyncio.to_thread() in agentic_edit.py,
     so this blocking load won't affect the event loop or health checks.
     """
-    global _lpips_model, _torch
+    global _lpips_model, _torch, _device
     if _lpips_model is None:
         logger.info("Loading LPIPS model (AlexNet backend)...")
         import lpips
         import torch
 
         _torch = torch
-        _lpips_model = lpips.LPIPS(net="alex", verbose=False)
-        logger.info("LPIPS model loaded successfully")
+        # Use the GPU when available; CPU inference stays float32
+        _device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        _lpips_model = lpips.LPIPS(net="alex", verbose=False).to(_device)
+        logger.info("LPIPS model loaded successfully on %s", _device)
     return _lpips_model
 
 
@@ -136,38 +143,50 @@ def compute_lpips_heatmap(
         )
         return np.zeros((H, W), dtype=np.float32)
 
+    if H < patch_size or W < patch_size:
+        # Image too small for patches
+        return np.zeros((H, W), dtype=np.float32)
+
     loss_fn = _get_lpips_model()
     torch = _get_torch()
 
-    # Convert to torch tensors in [-1, 1] range
-    # LPIPS expects (N, C, H, W) format
-    orig_t = torch.from_numpy(original.copy()).permute(2, 0, 1).float() / 127.5 - 1
-    edit_t = torch.from_numpy(edited.copy()).permute(2, 0, 1).float() / 127.5 - 1
-
-    scores = []
-    positions = []
-
-    # Compute LPIPS for each patch
-    for y in range(0, H - patch_size + 1, stride):
-        for x in range(0, W - patch_size + 1, stride):
-            p1 = orig_t[:, y : y + patch_size, x : x + patch_size].unsqueeze(0)
-            p2 = edit_t[:, y : y + patch_size, x : x + patch_size].unsqueeze(0)
-
-            with torch.no_grad():
-                score = loss_fn(p1, p2).item()
-
-            scores.append(score)
-            # Store center position of patch
-            positions.append((x + patch_size // 2, y + patch_size // 2))
-
-    if not scores:
-        # Image too small for patches
-        return np.zeros((H, W), dtype=np.float32)
+    # Stack both images into one uint8 (2, C, H, W) tensor. On CUDA it is
+    # pinned and copied as bytes, then scaled to LPIPS's [-1, 1] range on the
+    # device, so the transfer is 4x smaller than float32.
+    pair = torch.from_numpy(np.stack([original, edited])).permute(0, 3, 1, 2)
+    if _device.type == "cuda":
+        pair = pair.pin_memory().to(_device, non_blocking=True)
+    pair = pair.float() / 127.5 - 1
+
+    # View every patch without copying: (2, ny, nx, C, P, P), row by row
+    # like the patch grid. Batches are gathered from this view as needed.
+    windows = pair.unfold(2, patch_size, stride).unfold(3, patch_size, stride)
+    windows = windows.permute(0, 2, 3, 1, 4, 5)
+    num_y, num_x = windows.shape[1], windows.shape[2]
+
+    # Score patches in batches; on CUDA run under float16 autocast so the
+    # conv layers use tensor cores and activations take half the bandwidth
+    autocast = (
+        torch.autocast("cuda", dtype=torch.float16)
+        if _device.type == "cuda"
+        else contextlib.nullcontext()
+    )
+    num_patches = num_y * num_x
+    batch_scores = []
+    with torch.no_grad(), autocast:
+        for start in range(0, num_patches, _LPIPS_BATCH_SIZE):
+            end = min(start + _LPIPS_BATCH_SIZE, num_patches)
+            index = torch.arange(start, end, device=_device)
+            batch = windows[:, index // num_x, index % num_x]
+            batch_scores.append(loss_fn(batch[0], batch[1]).flatten())
+    scores = torch.cat(batch_scores).float().cpu().numpy()
+
+    # Center position of each patch, in the same row-by-row order
+    centers_x = np.arange(num_x) * stride + patch_size // 2
+    centers_y = np.arange(num_y) * stride + patch_size // 2
+    positions = np.stack(np.meshgrid(centers_x, centers_y), axis=-1).reshape(-1, 2)
 
     # Interpolate sparse scores to full resolution heatmap
-    positions = np.array(positions)
-    scores = np.array(scores)
-
     # Create grid for interpolation
     grid_x, grid_y = np.meshgrid(np.arange(W), np.arange(H))
 
@@ -226,7 +245,8 @@ def detect_edit_regions_lpips(
             (original.shape[1], original.shape[0]),
             Image.Resampling.LANCZOS,
         )
-        edited = np.array(edited_pil, dtype=np.uint8)
+        # asarray wraps the resized pixels read-only instead of copying them again
+        edited = np.asarray(edited_pil, dtype=np.uint8)
 
     # Ensure we have RGB images (3 channels)
     if len(original.shape) != 3 or original.shape[2] < 3:
@@ -255,6 +275,35 @@ def detect_edit_regions_lpips(
         float(np.mean(heatmap)),
     )
 
+    # 2-5. Threshold, clean up and extract regions
+    return postprocess_lpips_heatmap(heatmap, options)
+
+
+def postprocess_lpips_heatmap(
+    heatmap: NDArray[np.float32],
+    options: LPIPSDetectionOptions | None = None,
+) -> LPIPSDetectionResult:
+    """
+    Extract edit regions from a precomputed LPIPS heatmap.
+
+    This is the cheap second stage of detect_edit_regions_lpips(). Callers
+    that try several thresholds or min_area values on the same image pair
+    can compute the heatmap once with compute_lpips_heatmap() and call this
+    per option set. Only threshold, min_area and morphology_kernel_size are
+    used here; patch_size and stride apply to the heatmap.
+
+    Args:
+        heatmap: LPIPS heatmap of shape (H, W) from compute_lpips_heatmap()
+        options: Detection options
+
+    Returns:
+        LPIPSDetectionResult with polygon regions where edits were detected
+    """
+    if options is None:
+        options = LPIPSDetectionOptions()
+
+    H, W = heatmap.shape
+
     # 2. Threshold to binary mask
     binary = (heatmap > options.threshold).astype(np.uint8) * 255
 
@@ -297,10 +346,11 @@ def detect_edit_regions_lpips(
             cx = x + w // 2
             cy = y + h // 2
 
-        # Calculate significance from LPIPS values within the contour
-        mask = np.zeros(heatmap.shape, dtype=np.uint8)
-        cv2.drawContours(mask, [contour], -1, 1, -1)
-        region_lpips = heatmap[mask == 1]
+        # Calculate significance from LPIPS values within the contour, filling
+        # a mask only the size of its bounding box
+        mask = np.zeros((h, w), dtype=np.uint8)
+        cv2.drawContours(mask, [contour], -1, 1, -1, offset=(-x, -y))
+        region_lpips = heatmap[y : y + h, x : x + w][mask == 1]
 
         if len(region_lpips) > 0:
             # Scale to 0-100 (LPIPS values are typically 0-1)
@@ -308,8 +358,8 @@ def detect_edit_regions_lpips(
         else:
             significance = 0.0
 
-        # Convert contour points to list of tuples
-        polygon = [(int(p[0][0]), int(p[0][1])) for p in approx]
+        # Convert the (N, 1, 2) contour points to a list of tuples
+        polygon = [(int(px), int(py)) for px, py in approx.reshape(-1, 2).tolist()]
 
         regions.append(
             EditRegionPolygon(
@@ -342,6 +392,17 @@ def detect_edit_regions_lpips(
     )
 
 
+def _describe_region(index: int, region: EditRegionPolygon) -> str:
+    """Format one numbered region line for format_edit_regions_for_prompt()."""
+    x, y, w, h = region.bounding_box
+    return (
+        f"  {index}. Region centered at ({region.center[0]}, {region.center[1]}), "
+        f"bounding box from ({x}, {y}) to ({x + w - 1}, {y + h - 1}), "
+        f"size: {w}x{h}, area: {region.area}px, "
+        f"significance: {region.significance:.1f}/100"
+    )
+
+
 def format_edit_regions_for_prompt(result: LPIPSDetectionResult) -> str:
     """
     Format LPIPS detection result as a string for inclusion in AI prompts.
@@ -355,18 +416,10 @@ def format_edit_regions_for_prompt(result: LPIPSDetectionResult) -> str:
     if not result.regions:
         return "DETECTED EDIT LOCATIONS: No significant changes detected between images."
 
-    region_descriptions = []
-    for i, r in enumerate(result.regions, 1):
-        x, y, w, h = r.bounding_box
-        region_descriptions.append(
-            f"  {i}. Region centered at ({r.center[0]}, {r.center[1]}), "
-            f"bounding box from ({x}, {y}) to ({x + w - 1}, {y + h - 1}), "
-            f"size: {w}x{h}, area: {r.area}px, "
-            f"significance: {r.significance:.1f}/100"
-        )
+    region_descriptions = "\n".join(_describe_region(i, r) for i, r in enumerate(result.regions, 1))
 
     return f"""DETECTED EDIT LOCATIONS (by perceptual difference, sorted by significance):
-{chr(10).join(region_descriptions)}
+{region_descriptions}
 
 Total changed area: {result.total_changed_area}px ({result.percent_changed:.1f}% of image)
 Image dimensions: {result.image_width}x{result.image_height}"""
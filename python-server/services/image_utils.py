@@ -2,12 +2,12 @@
 
 from __future__ import annotations
 
-import base64
 import io
 import re
 from typing import NamedTuple
 
 import numpy as np
+import pybase64
 from numpy.typing import NDArray
 from PIL import Image
 
@@ -42,7 +42,7 @@ def decode_data_url(data_url: str) -> bytes:
     else:
         encoded = data_url
 
-    return base64.b64decode(encoded)
+    return pybase64.b64decode(encoded)
 
 
 def encode_data_url(data: bytes, mime_type: str = "image/png") -> str:
@@ -60,7 +60,7 @@ def encode_data_url(data: bytes, mime_type: str = "image/png") -> str:
         >>> encode_data_url(b'hello', 'text/plain')
         'data:text/plain;base64,aGVsbG8='
     """
-    encoded = base64.b64encode(data).decode("ascii")
+    encoded = pybase64.b64encode(data).decode("ascii")
     return f"data:{mime_type};base64,{encoded}"
 
 
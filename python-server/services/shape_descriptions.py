@@ -12,45 +12,62 @@ Uses a simple "shape language" format:
 
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import Callable, NamedTuple
+
 from schemas.agentic import SHAPE_TYPES, ShapeMetadata
 
 
+# Common color mappings, keyed by normalized (lowercase, "#"-prefixed) hex
+_COLOR_NAMES: dict[str, str] = {
+    "#000000": "black",
+    "#ffffff": "white",
+    "#ff0000": "red",
+    "#00ff00": "green",
+    "#0000ff": "blue",
+    "#ffff00": "yellow",
+    "#ff00ff": "magenta",
+    "#00ffff": "cyan",
+    "#ffa500": "orange",
+    "#800080": "purple",
+    "#ffc0cb": "pink",
+    "#808080": "gray",
+    "#a52a2a": "brown",
+    "#1e1e1e": "dark gray",
+    "#e03131": "red",  # Excalidraw red
+    "#2f9e44": "green",  # Excalidraw green
+    "#1971c2": "blue",  # Excalidraw blue
+    "#f08c00": "orange",  # Excalidraw orange
+    "#6741d9": "purple",  # Excalidraw violet
+    "#transparent": "transparent",
+}
+
+
+# Background color names that mean the shape has no fill
+_NO_FILL: frozenset[str | None] = frozenset({None, "", "transparent"})
+
+
+@lru_cache(maxsize=512)
+def _normalize_color(color: str) -> str:
+    """
+    Normalize a canvas color to lowercase with a "#" prefix.
+
+    Canvases reuse a handful of colors, so results are memoized per raw
+    input string.
+    """
+    color = color.lower().strip()
+    if color[:1] != "#":
+        color = "#" + color
+    return color
+
+
 def _color_name(hex_color: str) -> str:
     """
-    Convert hex color to a simple color name for readability.
+    Convert a normalized hex color to a simple color name for readability.
 
     Common colors get names, others stay as hex.
     """
-    # Normalize: lowercase, ensure # prefix
-    color = hex_color.lower().strip()
-    if not color.startswith("#"):
-        color = f"#{color}"
-
-    # Common color mappings
-    color_names = {
-        "#000000": "black",
-        "#ffffff": "white",
-        "#ff0000": "red",
-        "#00ff00": "green",
-        "#0000ff": "blue",
-        "#ffff00": "yellow",
-        "#ff00ff": "magenta",
-        "#00ffff": "cyan",
-        "#ffa500": "orange",
-        "#800080": "purple",
-        "#ffc0cb": "pink",
-        "#808080": "gray",
-        "#a52a2a": "brown",
-        "#1e1e1e": "dark gray",
-        "#e03131": "red",  # Excalidraw red
-        "#2f9e44": "green",  # Excalidraw green
-        "#1971c2": "blue",  # Excalidraw blue
-        "#f08c00": "orange",  # Excalidraw orange
-        "#6741d9": "purple",  # Excalidraw violet
-        "#transparent": "transparent",
-    }
-
-    return color_names.get(color, color)
+    return _COLOR_NAMES.get(hex_color, hex_color)
 
 
 def _format_point(x: float, y: float) -> str:
@@ -65,220 +82,219 @@ def _format_path(points: list, start_point=None, end_point=None) -> str:
     Uses points array if available, otherwise falls back to start/end points.
     """
     if points and len(points) >= 2:
-        path_parts = [_format_point(p.x, p.y) for p in points]
-        return " -> ".join(path_parts)
+        return " -> ".join([p.fmt for p in points])
     elif start_point and end_point:
-        return f"{_format_point(start_point.x, start_point.y)} -> {_format_point(end_point.x, end_point.y)}"
+        return f"{start_point.fmt} -> {end_point.fmt}"
     return "(no path)"
 
 
-def describe_shape(shape: ShapeMetadata, index: int = 1) -> str:
-    """
-    Generate an exhaustive, structured description of a single shape.
+class _Style(NamedTuple):
+    """Display properties shared by every shape description."""
 
-    The description includes all coordinates and properties needed to
-    understand or recreate the shape.
+    color: str
+    fill: str | None  # Named fill color, or None when unfilled/transparent
+    stroke_width: int
 
-    Args:
-        shape: The shape metadata to describe.
-        index: The shape number for labeling.
 
-    Returns:
-        A multi-line structured description of the shape.
-    """
-    color = _color_name(shape.strokeColor)
-    bg_color = _color_name(shape.backgroundColor) if shape.backgroundColor else None
-    has_fill = bg_color and bg_color != "transparent"
-    bbox = shape.boundingBox
-    stroke_width = int(shape.strokeWidth) if shape.strokeWidth else 1
-
-    # Calculate useful derived values
-    center_x = int(bbox.x + bbox.width / 2)
-    center_y = int(bbox.y + bbox.height / 2)
-
-    lines = []
-
-    if shape.type == "line":
-        # Determine line characteristics
-        characteristics = []
-
-        # Count segments
-        if shape.points and len(shape.points) > 2:
-            num_segments = len(shape.points) - 1
-            if shape.isClosed:
-                characteristics.append("closed polygon")
-                characteristics.append(f"{len(shape.points)} vertices")
-            else:
-                characteristics.append("polyline")
-                characteristics.append(f"{num_segments} segments")
-        else:
-            characteristics.append("line segment")
+def _style_line(style: _Style) -> str:
+    """Format the indented "Stroke: Npx[, Fill: color]" line."""
+    if style.fill:
+        return f"  Stroke: {style.stroke_width}px, Fill: {style.fill}"
+    return f"  Stroke: {style.stroke_width}px"
 
-        if shape.isCurved:
-            characteristics.append("curved")
 
-        if has_fill:
-            characteristics.append(f"{bg_color}-filled")
+def _bounds_line(shape: ShapeMetadata) -> str:
+    """Format the indented corner-to-corner bounds line with pixel size."""
+    bbox = shape.boundingBox
+    top_left = _format_point(bbox.x, bbox.y)
+    bottom_right = _format_point(bbox.x + bbox.width, bbox.y + bbox.height)
+    return f"  Bounds: {top_left} to {bottom_right}, {int(bbox.width)}x{int(bbox.height)}px"
+
 
-        char_str = ", ".join(characteristics)
-        lines.append(f"LINE #{index}: {color} {char_str}")
+def _describe_line(shape: ShapeMetadata, index: int, style: _Style) -> list[str]:
+    # Determine line characteristics
+    characteristics = []
 
-        # Path with all points
-        path = _format_path(shape.points, shape.startPoint, shape.endPoint)
+    # Count segments
+    if shape.points and len(shape.points) > 2:
+        num_segments = len(shape.points) - 1
         if shape.isClosed:
-            path += " -> [closed]"
-        lines.append(f"  Path: {path}")
-
-        # Style
-        style_parts = [f"Stroke: {stroke_width}px"]
-        if has_fill:
-            style_parts.append(f"Fill: {bg_color}")
-        lines.append(f"  {', '.join(style_parts)}")
-
-    elif shape.type == "arrow":
-        # Determine arrow characteristics
-        characteristics = []
-
-        if shape.points and len(shape.points) > 2:
-            num_segments = len(shape.points) - 1
-            characteristics.append(f"{num_segments}-segment")
-
-        if shape.isCurved:
-            characteristics.append("curved")
-
-        # Arrowhead description
-        if shape.hasStartArrowhead and shape.hasEndArrowhead:
-            characteristics.append("double-headed")
-        elif shape.hasStartArrowhead:
-            characteristics.append("start-headed")
-        # Default is end-headed, don't need to mention
-
-        char_str = ", ".join(characteristics) if characteristics else "straight"
-        lines.append(f"ARROW #{index}: {color} {char_str}")
-
-        # Path with all points
-        path = _format_path(shape.points, shape.startPoint, shape.endPoint)
-        lines.append(f"  Path: {path}")
-
-        # Style and arrowhead info
-        arrowhead_pos = []
-        if shape.hasStartArrowhead:
-            arrowhead_pos.append("start")
-        if shape.hasEndArrowhead or (not shape.hasStartArrowhead):
-            arrowhead_pos.append("end")
-
-        lines.append(f"  Stroke: {stroke_width}px, Arrowhead: {' & '.join(arrowhead_pos)}")
-
-    elif shape.type == "rectangle":
-        fill_str = f"{bg_color}-filled" if has_fill else "outline"
-        lines.append(f"RECTANGLE #{index}: {color} {fill_str}")
-
-        # Bounds as corner coordinates
-        top_left = _format_point(bbox.x, bbox.y)
-        bottom_right = _format_point(bbox.x + bbox.width, bbox.y + bbox.height)
-        lines.append(f"  Bounds: {top_left} to {bottom_right}, {int(bbox.width)}x{int(bbox.height)}px")
-
-        # Style
-        style_parts = [f"Stroke: {stroke_width}px"]
-        if has_fill:
-            style_parts.append(f"Fill: {bg_color}")
-        lines.append(f"  {', '.join(style_parts)}")
-
-    elif shape.type == "diamond":
-        fill_str = f"{bg_color}-filled" if has_fill else "outline"
-        lines.append(f"DIAMOND #{index}: {color} {fill_str}")
-
-        # Bounds
-        top_left = _format_point(bbox.x, bbox.y)
-        bottom_right = _format_point(bbox.x + bbox.width, bbox.y + bbox.height)
-        lines.append(f"  Bounds: {top_left} to {bottom_right}, {int(bbox.width)}x{int(bbox.height)}px")
-
-        # Style
-        style_parts = [f"Stroke: {stroke_width}px"]
-        if has_fill:
-            style_parts.append(f"Fill: {bg_color}")
-        lines.append(f"  {', '.join(style_parts)}")
-
-    elif shape.type == "ellipse":
-        # Check if it's a circle
-        is_circle = abs(bbox.width - bbox.height) < 5
-        shape_name = "CIRCLE" if is_circle else "ELLIPSE"
-        fill_str = f"{bg_color}-filled" if has_fill else "outline"
-
-        lines.append(f"{shape_name} #{index}: {color} {fill_str}")
-
-        if is_circle:
-            radius = int(bbox.width / 2)
-            lines.append(f"  Center: {_format_point(center_x, center_y)}, Radius: {radius}px")
+            characteristics.append("closed polygon")
+            characteristics.append(f"{len(shape.points)} vertices")
         else:
-            lines.append(f"  Center: {_format_point(center_x, center_y)}, Size: {int(bbox.width)}x{int(bbox.height)}px")
+            characteristics.append("polyline")
+            characteristics.append(f"{num_segments} segments")
+    else:
+        characteristics.append("line segment")
+
+    if shape.isCurved:
+        characteristics.append("curved")
+
+    if style.fill:
+        characteristics.append(f"{style.fill}-filled")
+
+    # Path with all points
+    path = _format_path(shape.points, shape.startPoint, shape.endPoint)
+    closed = " -> [closed]" if shape.isClosed else ""
+
+    return [
+        f"LINE #{index}: {style.color} {', '.join(characteristics)}",
+        f"  Path: {path}{closed}",
+        _style_line(style),
+    ]
+
+
+def _describe_arrow(shape: ShapeMetadata, index: int, style: _Style) -> list[str]:
+    # Determine arrow characteristics
+    characteristics = []
+
+    if shape.points and len(shape.points) > 2:
+        num_segments = len(shape.points) - 1
+        characteristics.append(f"{num_segments}-segment")
+
+    if shape.isCurved:
+        characteristics.append("curved")
+
+    # Arrowhead description
+    if shape.hasStartArrowhead and shape.hasEndArrowhead:
+        characteristics.append("double-headed")
+    elif shape.hasStartArrowhead:
+        characteristics.append("start-headed")
+    # Default is end-headed, don't need to mention
+
+    char_str = ", ".join(characteristics) if characteristics else "straight"
 
-        # Style
-        style_parts = [f"Stroke: {stroke_width}px"]
-        if has_fill:
-            style_parts.append(f"Fill: {bg_color}")
-        lines.append(f"  {', '.join(style_parts)}")
+    # Path with all points
+    path = _format_path(shape.points, shape.startPoint, shape.endPoint)
 
-    elif shape.type == "freedraw":
-        lines.append(f"FREEDRAW #{index}: {color} sketch")
+    # Arrowhead positions
+    arrowhead_pos = []
+    if shape.hasStartArrowhead:
+        arrowhead_pos.append("start")
+    if shape.hasEndArrowhead or (not shape.hasStartArrowhead):
+        arrowhead_pos.append("end")
 
-        # Bounds
-        top_left = _format_point(bbox.x, bbox.y)
-        bottom_right = _format_point(bbox.x + bbox.width, bbox.y + bbox.height)
-        point_info = f", {shape.pointCount} points" if shape.pointCount else ""
-        lines.append(f"  Bounds: {top_left} to {bottom_right}{point_info}")
+    return [
+        f"ARROW #{index}: {style.color} {char_str}",
+        f"  Path: {path}",
+        f"  Stroke: {style.stroke_width}px, Arrowhead: {' & '.join(arrowhead_pos)}",
+    ]
 
-        lines.append(f"  Stroke: {stroke_width}px")
 
-    elif shape.type == "text":
-        text_content = shape.textContent or "(empty)"
-        # Escape quotes and truncate if too long
-        if len(text_content) > 50:
-            text_content = text_content[:47] + "..."
-        text_content = text_content.replace('"', '\\"')
+def _describe_box(label: str):
+    """Build a handler for outline/filled shapes described by their bounds."""
 
-        lines.append(f'TEXT #{index}: "{text_content}"')
-        lines.append(f"  Position: {_format_point(bbox.x, bbox.y)}")
+    def describe(shape: ShapeMetadata, index: int, style: _Style) -> list[str]:
+        fill_str = f"{style.fill}-filled" if style.fill else "outline"
+        return [
+            f"{label} #{index}: {style.color} {fill_str}",
+            _bounds_line(shape),
+            _style_line(style),
+        ]
 
-        size_info = f", Size: {int(shape.fontSize)}px" if shape.fontSize else ""
-        lines.append(f"  Color: {color}{size_info}")
+    return describe
 
+
+def _describe_ellipse(shape: ShapeMetadata, index: int, style: _Style) -> list[str]:
+    bbox = shape.boundingBox
+    center = _format_point(*bbox.center)
+    fill_str = f"{style.fill}-filled" if style.fill else "outline"
+
+    if bbox.is_square:
+        header = f"CIRCLE #{index}: {style.color} {fill_str}"
+        geometry = f"  Center: {center}, Radius: {int(bbox.width / 2)}px"
     else:
-        # Fallback for unknown types
-        lines.append(f"{shape.type.upper()} #{index}: {color}")
-        lines.append(f"  Bounds: {_format_point(bbox.x, bbox.y)}, {int(bbox.width)}x{int(bbox.height)}px")
+        header = f"ELLIPSE #{index}: {style.color} {fill_str}"
+        geometry = f"  Center: {center}, Size: {int(bbox.width)}x{int(bbox.height)}px"
 
-    return "\n".join(lines)
+    return [header, geometry, _style_line(style)]
 
 
-def build_shapes_context(shapes: list[ShapeMetadata] | None) -> str:
+def _describe_freedraw(shape: ShapeMetadata, index: int, style: _Style) -> list[str]:
+    bbox = shape.boundingBox
+    top_left = _format_point(bbox.x, bbox.y)
+    bottom_right = _format_point(bbox.x + bbox.width, bbox.y + bbox.height)
+    point_info = f", {shape.pointCount} points" if shape.pointCount else ""
+
+    return [
+        f"FREEDRAW #{index}: {style.color} sketch",
+        f"  Bounds: {top_left} to {bottom_right}{point_info}",
+        f"  Stroke: {style.stroke_width}px",
+    ]
+
+
+def _describe_text(shape: ShapeMetadata, index: int, style: _Style) -> list[str]:
+    text_content = shape.textContent or "(empty)"
+    # Escape quotes and truncate if too long
+    if len(text_content) > 50:
+        text_content = f"{text_content[:47]}..."
+    text_content = text_content.replace('"', '\\"')
+
+    size_info = f", Size: {int(shape.fontSize)}px" if shape.fontSize else ""
+
+    return [
+        f'TEXT #{index}: "{text_content}"',
+        f"  Position: {_format_point(shape.boundingBox.x, shape.boundingBox.y)}",
+        f"  Color: {style.color}{size_info}",
+    ]
+
+
+def _describe_unknown(shape: ShapeMetadata, index: int, style: _Style) -> list[str]:
+    bbox = shape.boundingBox
+    return [
+        f"{shape.type.upper()} #{index}: {style.color}",
+        f"  Bounds: {_format_point(bbox.x, bbox.y)}, {int(bbox.width)}x{int(bbox.height)}px",
+    ]
+
+
+# Per-type description builders, dispatched on ShapeMetadata.type
+_HANDLERS: dict[str, Callable[[ShapeMetadata, int, _Style], list[str]]] = {
+    "line": _describe_line,
+    "arrow": _describe_arrow,
+    "rectangle": _describe_box("RECTANGLE"),
+    "diamond": _describe_box("DIAMOND"),
+    "ellipse": _describe_ellipse,
+    "freedraw": _describe_freedraw,
+    "text": _describe_text,
+}
+
+
+def describe_shape(shape: ShapeMetadata, index: int = 1) -> str:
     """
-    Build a prompt section describing all user-drawn shapes.
+    Generate an exhaustive, structured description of a single shape.
 
-    Uses an exhaustive, structured format that includes all coordinates
-    and properties needed to understand or recreate each shape.
+    The description includes all coordinates and properties needed to
+    understand or recreate the shape.
 
     Args:
-        shapes: List of shape metadata from the canvas, or None.
+        shape: The shape metadata to describe.
+        index: The shape number for labeling.
 
     Returns:
-        A formatted prompt section with shape descriptions, or empty string if no shapes.
+        A multi-line structured description of the shape.
     """
-    if not shapes:
-        return ""
+    bg = shape.backgroundColor
+    bg_color = _color_name(_normalize_color(bg)) if bg else None
+    style = _Style(
+        color=_color_name(_normalize_color(shape.strokeColor)),
+        fill=None if bg_color in _NO_FILL else bg_color,
+        stroke_width=int(shape.strokeWidth) if shape.strokeWidth else 1,
+    )
 
-    # Group shapes by type for better organization
-    descriptions = []
-    for i, shape in enumerate(shapes, 1):
-        descriptions.append(describe_shape(shape, i))
+    handler = _HANDLERS.get(shape.type, _describe_unknown)
+    return "\n".join(handler(shape, index, style))
 
-    return f"""
+
+# Static text wrapped around the shape descriptions in build_shapes_context
+_CONTEXT_HEADER = """
 ## USER-DRAWN ANNOTATIONS
 
 The user has drawn the following shapes on the canvas. Each shape is described
 with exact coordinates and properties:
 
-{chr(10).join(descriptions)}
+"""
+
+_CONTEXT_FOOTER = """
 
 ---
 INTERPRETATION GUIDE:
@@ -291,3 +307,23 @@ INTERPRETATION GUIDE:
 
 Use these annotations to understand exactly WHERE and WHAT the user wants edited.
 """
+
+
+def build_shapes_context(shapes: list[ShapeMetadata] | None) -> str:
+    """
+    Build a prompt section describing all user-drawn shapes.
+
+    Uses an exhaustive, structured format that includes all coordinates
+    and properties needed to understand or recreate each shape.
+
+    Args:
+        shapes: List of shape metadata from the canvas, or None.
+
+    Returns:
+        A formatted prompt section with shape descriptions, or empty string if no shapes.
+    """
+    if not shapes:
+        return ""
+
+    descriptions = "\n".join(describe_shape(shape, i) for i, shape in enumerate(shapes, 1))
+    return _CONTEXT_HEADER + descriptions + _CONTEXT_FOOTER
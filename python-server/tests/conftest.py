@@ -1,16 +1,36 @@
 """Pytest configuration and fixtures."""
 
+import asyncio
 import json
 import os
 import sys
 import warnings
 import zipfile
 from pathlib import Path
-from typing import Any
+from types import ModuleType, SimpleNamespace
+from typing import Any, Callable
+from unittest.mock import MagicMock
 
 import pytest
+import pytest_asyncio
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on Windows
+    uvloop = None
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# Load environment variables from .env file
+env_path = Path(__file__).parent.parent / ".env"
+load_dotenv(env_path)
+
+# Import the app once per session; test modules reach it through the fixtures
+# below rather than each doing their own sys.path setup and import.
+import main
+from main import app
 from services.image_utils import encode_data_url
 
 # Configure pytest-asyncio
@@ -27,16 +47,131 @@ def pytest_configure(config):
     )
 
 
-# Load environment variables from .env file
-env_path = Path(__file__).parent.parent / ".env"
-load_dotenv(env_path)
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
 # Path to manipulation test cases
 MANIPULATIONS_DIR = Path(__file__).parent.parent.parent / "manipulations"
 
+def pytest_asyncio_loop_factories(config, item) -> dict[str, Callable[[], asyncio.AbstractEventLoop]]:
+    """Run async tests on uvloop when it is installed.
+
+    pytest-asyncio creates each test and fixture loop from the returned
+    factory. uvloop ships with uvicorn[standard]; platforms without it fall
+    back to asyncio's default loop.
+    """
+    if uvloop is None:
+        return {"asyncio": asyncio.new_event_loop}
+    return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest.fixture(autouse=True)
+def _clear_lru_caches():
+    """Clear functools caches on the app module after every test.
+
+    Tests set and delete GEMINI_API_KEY per-test; anything in main memoized
+    with lru_cache/cache would otherwise carry a stale value into the next
+    test.
+    """
+    yield
+    for name in dir(main):
+        cache_clear = getattr(getattr(main, name, None), "cache_clear", None)
+        if callable(cache_clear):
+            cache_clear()
+
+
+@pytest.fixture(scope="session")
+def app_instance():
+    """Return the FastAPI app imported once for the test session."""
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app_instance):
+    """Create a test client shared by every endpoint test in the session.
+
+    Entering the client runs the app lifespan once, and its HTTPX transport
+    and connection pool are reused across tests. Tests patch env vars and the
+    genai client per-test, so the client itself carries no state between them.
+    """
+    from fastapi.testclient import TestClient
+
+    with TestClient(app_instance) as test_client:
+        yield test_client
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def async_client(app_instance):
+    """Create an httpx AsyncClient that calls the FastAPI app in-process.
+
+    Async tests use this instead of TestClient: requests run on the event
+    loop through ASGITransport rather than hopping to the worker thread
+    TestClient spins up for every call. ASGITransport does not send lifespan
+    events, so the app's lifespan context is entered here directly. Kept open
+    for the whole session so the transport and pool are built once.
+    """
+    import httpx
+
+    async with app_instance.router.lifespan_context(app_instance):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app_instance), base_url="http://test"
+        ) as async_client:
+            yield async_client
+
+
+@pytest.fixture(scope="session")
+def fake_genai() -> ModuleType:
+    """Build a stand-in google.genai module once for the whole session.
+
+    Client is a MagicMock whose return_value is the client every
+    genai.Client(...) call hands out; types is a MagicMock so config
+    builders such as GenerateContentConfig accept anything.
+    """
+    module = ModuleType("google.genai")
+    module.Client = MagicMock()
+    module.types = MagicMock()
+    return module
+
+
+@pytest.fixture
+def patched_genai(monkeypatch, fake_genai) -> MagicMock:
+    """Install the fake google.genai module for the duration of one test.
+
+    The real module is already imported by graphs/services at collection
+    time, so both sys.modules and the google package attribute are swapped.
+    Returns the mock client so tests only need to configure
+    client.aio.models.generate_content. The module is shared across the
+    session, so each test gets a fresh client mock: reset_mock() alone would
+    keep stubs assigned by earlier tests.
+    """
+    import google
+
+    fake_genai.Client.reset_mock()
+    fake_genai.Client.return_value = MagicMock()
+    monkeypatch.setitem(sys.modules, "google.genai", fake_genai)
+    monkeypatch.setattr(google, "genai", fake_genai)
+    return fake_genai.Client.return_value
+
+
+@pytest.fixture
+def fake_graph(monkeypatch) -> Callable[[list[Any]], None]:
+    """Replace main.agentic_edit_graph with a stub graph.
+
+    Returns a setter taking the (mode, data) tuples that astream() should
+    yield in order. An exception instance in the list is raised when reached,
+    which lets tests exercise the endpoints' SSE error path.
+    """
+    graph = SimpleNamespace()
+
+    def set_stream(events: list[Any]) -> None:
+        async def astream(*args, **kwargs):
+            for event in events:
+                if isinstance(event, BaseException):
+                    raise event
+                yield event
+
+        graph.astream = astream
+
+    monkeypatch.setattr("main.agentic_edit_graph", graph)
+    return set_stream
+
 
 @pytest.fixture
 def manipulations_dir() -> Path:
@@ -0,0 +1,13 @@
+"""Gemini-style response stand-ins shared by the image endpoint tests."""
+
+from types import SimpleNamespace
+
+
+def make_image_response(data, mime_type="image/png"):
+    """Build a Gemini-style response whose first part carries inline_data.
+
+    Passing ``data=None`` yields a part with no inline_data at all.
+    """
+    inline_data = SimpleNamespace(mime_type=mime_type, data=data) if data is not None else None
+    part = SimpleNamespace(inline_data=inline_data)
+    return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=[part]))])
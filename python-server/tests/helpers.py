@@ -0,0 +1,44 @@
+"""Request and async stub helpers shared by the endpoint tests."""
+
+from typing import Any, Callable
+
+import orjson
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def post_json(client, url: str, body: dict[str, Any] | bytes):
+    """POST a JSON body serialized with orjson instead of httpx's stdlib json.
+
+    ``body`` may be a dict or bytes already produced by ``orjson.dumps`` at
+    module import time. Works with both TestClient and the AsyncClient
+    fixture; with the latter the returned coroutine must be awaited.
+    """
+    content = body if isinstance(body, bytes) else orjson.dumps(body)
+    return client.post(url, content=content, headers=JSON_HEADERS)
+
+
+def partial_coro(value: Any) -> Callable[..., Any]:
+    """Return an async function that ignores its arguments and returns value.
+
+    A lighter stand-in for AsyncMock(return_value=...) when a test only needs
+    the awaited result and never inspects the calls.
+    """
+
+    async def coro(*args, **kwargs):
+        return value
+
+    return coro
+
+
+def async_raises(exc: BaseException) -> Callable[..., Any]:
+    """Return an async function that ignores its arguments and raises exc.
+
+    The error-path counterpart of partial_coro, replacing
+    AsyncMock(side_effect=exc).
+    """
+
+    async def coro(*args, **kwargs):
+        raise exc
+
+    return coro
@@ -0,0 +1,55 @@
+"""Pre-rendered JSON request bodies shared by the endpoint tests.
+
+Bodies are serialized once at import time and sent as raw bytes (see
+``post_json`` in tests/helpers.py), so the base64 image is never re-encoded per
+request.
+"""
+
+import orjson
+import pybase64
+
+# Valid base64 image for testing (1x1 transparent PNG)
+VALID_BASE64_IMAGE = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+# The same image without the data URL prefix, and decoded once to raw bytes
+VALID_BASE64_DATA = VALID_BASE64_IMAGE.split(",", 1)[1]
+VALID_IMAGE_BYTES: bytes = pybase64.b64decode(VALID_BASE64_DATA, validate=True)
+
+GENERATE_IMAGE_OK: bytes = orjson.dumps(
+    {
+        "model": "gemini-3-pro-image-preview",
+        "sourceImage": VALID_BASE64_IMAGE,
+        "prompt": "Make it blue",
+    }
+)
+GENERATE_IMAGE_MISSING_MODEL: bytes = orjson.dumps(
+    {
+        "sourceImage": VALID_BASE64_IMAGE,
+        "prompt": "Test prompt",
+    }
+)
+
+INPAINT_OK: bytes = orjson.dumps(
+    {
+        "sourceImage": VALID_BASE64_IMAGE,
+        "maskImage": VALID_BASE64_IMAGE,
+        "prompt": "Remove this object",
+    }
+)
+INPAINT_MISSING_MASK_IMAGE: bytes = orjson.dumps(
+    {
+        "sourceImage": VALID_BASE64_IMAGE,
+        "prompt": "Remove object",
+    }
+)
+
+AGENTIC_EDIT_OK: bytes = orjson.dumps(
+    {
+        "sourceImage": VALID_BASE64_IMAGE,
+        "prompt": "Make it blue",
+    }
+)
+AGENTIC_EDIT_MISSING_PROMPT: bytes = orjson.dumps(
+    {
+        "sourceImage": VALID_BASE64_IMAGE,
+    }
+)
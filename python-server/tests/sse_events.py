@@ -0,0 +1,107 @@
+"""SSE parsing helpers shared by the streaming endpoint tests.
+
+Events are decoded as the server formats them in utils.sse:
+
+    event: <type>
+    data: <json>
+
+    (blank line ends the event)
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
+
+import orjson
+
+
+@dataclass
+class SSEStream:
+    """Parsed SSE events stored as parallel type and data lists."""
+
+    types: list[str] = field(default_factory=list)
+    datas: list[Any] = field(default_factory=list)
+
+    def append(self, event_type: str, data: Any) -> None:
+        self.types.append(event_type)
+        self.datas.append(data)
+
+    def find(self, event_type: str) -> Any:
+        """Return the data of the first event of event_type, or None."""
+        try:
+            return self.datas[self.types.index(event_type)]
+        except ValueError:
+            return None
+
+
+def iter_sse_events(lines: Iterable[str]) -> Iterator[tuple[str, Any]]:
+    """
+    Incrementally parse SSE lines, yielding (type, data) per blank-line terminator.
+
+    Lines may still carry a trailing "\r" (SSE allows CRLF terminators);
+    nothing else needs stripping. Data that is not valid JSON is kept as the
+    raw string.
+    """
+    event_type = data = None
+
+    for line in lines:
+        line = line.rstrip("\r")
+        if line.startswith("event:"):
+            event_type = line[6:].lstrip()
+        elif line.startswith("data:"):
+            data = line[5:].lstrip()
+            try:
+                data = orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        elif not line:
+            if event_type is not None and data is not None:
+                yield event_type, data
+            event_type = data = None
+
+    # Handle last event if no trailing newline
+    if event_type is not None and data is not None:
+        yield event_type, data
+
+
+_SSE_FRAME = re.compile(r"^event:\s*(.*?)\ndata:\s*(.*)$", re.M)
+
+
+def parse_sse_events(response_text: str) -> SSEStream:
+    """
+    Parse a complete SSE response body into an SSEStream.
+
+    Splits on the blank-line frame delimiter and pulls each frame's event
+    and data lines out with a single regex match, decoding data with orjson.
+    """
+    matches = [
+        match for frame in response_text.split("\n\n") if (match := _SSE_FRAME.search(frame))
+    ]
+    return SSEStream(
+        types=[match.group(1) for match in matches],
+        datas=[orjson.loads(match.group(2)) for match in matches],
+    )
+
+
+async def async_sse_summary(response) -> SSEStream:
+    """
+    Consume an httpx.AsyncClient SSE stream into an SSEStream.
+
+    Buffers lines only until each blank-line terminator, parses that event,
+    and stops as soon as the complete event arrives.
+    """
+    stream = SSEStream()
+    block = []
+    async for line in response.aiter_lines():
+        block.append(line)
+        if line.rstrip("\r"):
+            continue
+        for event_type, data in iter_sse_events(block):
+            stream.append(event_type, data)
+        block = []
+        if stream.types and stream.types[-1] == "complete":
+            break
+    else:
+        for event_type, data in iter_sse_events(block):
+            stream.append(event_type, data)
+    return stream
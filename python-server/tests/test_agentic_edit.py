@@ -12,8 +12,8 @@ Tests cover:
 import asyncio
 import os
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -29,6 +29,7 @@ from graphs.agentic_edit import (
 )
 from schemas.agentic import AIProgressEvent, IterationInfo
 from services.image_utils import decode_data_url, encode_data_url, get_mime_type
+from tests.helpers import async_raises, partial_coro
 
 # =============================================================================
 # Fixtures
@@ -137,6 +138,18 @@ def state_with_mask(small_test_image: str) -> GraphState:
     )
 
 
+@pytest.fixture
+def gemini_client(monkeypatch) -> SimpleNamespace:
+    """Make graphs.agentic_edit.get_gemini_client return a stub client.
+
+    Tests assign only the async methods a node calls (generate_with_thinking,
+    generate_image, evaluate) on the returned namespace.
+    """
+    client = SimpleNamespace()
+    monkeypatch.setattr("graphs.agentic_edit.get_gemini_client", lambda: client)
+    return client
+
+
 # =============================================================================
 # Image Utility Tests
 # =============================================================================
@@ -259,13 +272,12 @@ class TestPlanningNode:
     """Tests for the planning node."""
 
     @pytest.mark.asyncio
-    async def test_planning_returns_refined_prompt(self, basic_state: GraphState):
+    async def test_planning_returns_refined_prompt(self, basic_state: GraphState, gemini_client: SimpleNamespace):
         """Test that planning node returns a refined prompt."""
         from services.gemini_client import GeminiResult
 
-        mock_client = MagicMock()
-        mock_client.generate_with_thinking = AsyncMock(
-            return_value=GeminiResult(
+        gemini_client.generate_with_thinking = partial_coro(
+            GeminiResult(
                 text="",
                 thinking="Let me think about this...",
                 function_call={
@@ -275,74 +287,66 @@ class TestPlanningNode:
             )
         )
 
-        with patch("graphs.agentic_edit.get_gemini_client", return_value=mock_client):
-            result = await planning_node(basic_state)
+        result = await planning_node(basic_state)
 
-            assert "refined_prompt" in result
-            assert result["refined_prompt"] == "Create a vibrant red rectangular button"
-            assert "planning_complete" in result["steps"]
+        assert "refined_prompt" in result
+        assert result["refined_prompt"] == "Create a vibrant red rectangular button"
+        assert "planning_complete" in result["steps"]
 
     @pytest.mark.asyncio
-    async def test_planning_falls_back_on_error(self, basic_state: GraphState):
+    async def test_planning_falls_back_on_error(self, basic_state: GraphState, gemini_client: SimpleNamespace):
         """Test that planning falls back to user prompt on error."""
-        mock_client = MagicMock()
-        mock_client.generate_with_thinking = AsyncMock(side_effect=Exception("API Error"))
+        gemini_client.generate_with_thinking = async_raises(Exception("API Error"))
 
-        with patch("graphs.agentic_edit.get_gemini_client", return_value=mock_client):
-            result = await planning_node(basic_state)
+        result = await planning_node(basic_state)
 
-            assert result["refined_prompt"] == basic_state.user_prompt
-            assert "planning_failed" in result["steps"]
+        assert result["refined_prompt"] == basic_state.user_prompt
+        assert "planning_failed" in result["steps"]
 
 
 class TestGenerateNode:
     """Tests for the image generation node."""
 
     @pytest.mark.asyncio
-    async def test_generate_returns_image(self, basic_state: GraphState):
+    async def test_generate_returns_image(self, basic_state: GraphState, gemini_client: SimpleNamespace):
         """Test that generate node returns an image."""
         from services.gemini_client import GeminiImageResult
 
         basic_state.refined_prompt = "Create a red button"
 
-        mock_client = MagicMock()
-        mock_client.generate_image = AsyncMock(return_value=GeminiImageResult(image_bytes=b"fake image data", text=""))
+        gemini_client.generate_image = partial_coro(GeminiImageResult(image_bytes=b"fake image data", text=""))
 
-        with patch("graphs.agentic_edit.get_gemini_client", return_value=mock_client):
-            result = await generate_node(basic_state)
+        result = await generate_node(basic_state)
 
-            assert "current_result" in result
-            assert result["current_result"].startswith("data:image/png;base64,")
-            assert result["current_iteration"] == 1
+        assert "current_result" in result
+        assert result["current_result"].startswith("data:image/png;base64,")
+        assert result["current_iteration"] == 1
 
     @pytest.mark.asyncio
-    async def test_generate_handles_error(self, basic_state: GraphState):
+    async def test_generate_handles_error(self, basic_state: GraphState, gemini_client: SimpleNamespace):
         """Test that generate node handles errors gracefully."""
         basic_state.refined_prompt = "Create a red button"
 
-        mock_client = MagicMock()
-        mock_client.generate_image = AsyncMock(side_effect=Exception("Generation failed"))
+        gemini_client.generate_image = async_raises(Exception("Generation failed"))
 
-        with patch("graphs.agentic_edit.get_gemini_client", return_value=mock_client):
-            result = await generate_node(basic_state)
+        result = await generate_node(basic_state)
 
-            assert result.get("current_result") is None
-            assert "failed" in result["steps"][0]
+        assert result.get("current_result") is None
+        assert "failed" in result["steps"][0]
 
 
 class TestSelfCheckNode:
     """Tests for the self-check node."""
 
     @pytest.mark.asyncio
-    async def test_self_check_returns_satisfied(self, basic_state: GraphState):
+    async def test_self_check_returns_satisfied(self, basic_state: GraphState, gemini_client: SimpleNamespace):
         """Test self-check returns satisfied when edit is good."""
         basic_state.current_iteration = 1
         basic_state.current_result = basic_state.source_image
         basic_state.refined_prompt = "Add a button"
 
-        mock_client = MagicMock()
-        mock_client.evaluate = AsyncMock(
-            return_value={
+        gemini_client.evaluate = partial_coro(
+            {
                 "satisfied": True,
                 "reasoning": "Edit looks good",
                 "revised_prompt": "",
@@ -350,22 +354,20 @@ class TestSelfCheckNode:
             }
         )
 
-        with patch("graphs.agentic_edit.get_gemini_client", return_value=mock_client):
-            result = await self_check_node(basic_state)
+        result = await self_check_node(basic_state)
 
-            assert result["satisfied"] is True
-            assert "looks good" in result["check_reasoning"]
+        assert result["satisfied"] is True
+        assert "looks good" in result["check_reasoning"]
 
     @pytest.mark.asyncio
-    async def test_self_check_returns_revision(self, basic_state: GraphState):
+    async def test_self_check_returns_revision(self, basic_state: GraphState, gemini_client: SimpleNamespace):
         """Test self-check returns revision suggestion when not satisfied."""
         basic_state.current_iteration = 1
         basic_state.current_result = basic_state.source_image
         basic_state.refined_prompt = "Add a button"
 
-        mock_client = MagicMock()
-        mock_client.evaluate = AsyncMock(
-            return_value={
+        gemini_client.evaluate = partial_coro(
+            {
                 "satisfied": False,
                 "reasoning": "Button too small",
                 "revised_prompt": "Add a larger button",
@@ -373,12 +375,11 @@ class TestSelfCheckNode:
             }
         )
 
-        with patch("graphs.agentic_edit.get_gemini_client", return_value=mock_client):
-            result = await self_check_node(basic_state)
+        result = await self_check_node(basic_state)
 
-            assert result["satisfied"] is False
-            assert "too small" in result["check_reasoning"]
-            assert result["refined_prompt"] == "Add a larger button"
+        assert result["satisfied"] is False
+        assert "too small" in result["check_reasoning"]
+        assert result["refined_prompt"] == "Add a larger button"
 
     @pytest.mark.asyncio
     async def test_self_check_skips_at_max_iterations(self, basic_state: GraphState):
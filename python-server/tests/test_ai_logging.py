@@ -12,9 +12,12 @@ Tests cover:
 import base64
 import io
 import logging
+import random
 import pytest
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch, call
 
+import pybase64
 from PIL import Image
 
 from utils.ai_logging import (
@@ -26,6 +29,8 @@ from utils.ai_logging import (
     extract_base64_data,
     extract_mime_type,
     extract_images_from_contents,
+    split_data_url,
+    _peek_dimensions,
     ImageMetadata,
     ImageLogData,
 )
@@ -185,6 +190,56 @@ class TestExtractMimeType:
         assert result == "image/gif"
 
 
+# =============================================================================
+# Tests for split_data_url
+# =============================================================================
+
+
+class TestSplitDataUrl:
+    """Tests for split_data_url helper function."""
+
+    def test_splits_data_url(self):
+        """Should return the MIME type and base64 data together."""
+        result = split_data_url("data:image/jpeg;base64,XYZ789==")
+        assert result == ("image/jpeg", "XYZ789==")
+
+    def test_raw_base64_uses_default_mime_type(self):
+        """Should return raw base64 unchanged with the image/png default."""
+        result = split_data_url("ABC123==")
+        assert result == ("image/png", "ABC123==")
+
+    def test_cached_header_does_not_leak_payload(self):
+        """Should return each URL's own payload when headers repeat."""
+        first = split_data_url("data:image/webp;base64,FIRST==")
+        second = split_data_url("data:image/webp;base64,SECOND==")
+        again = split_data_url("data:image/webp;base64,FIRST==")
+
+        assert first == ("image/webp", "FIRST==")
+        assert second == ("image/webp", "SECOND==")
+        assert again == first
+
+    def test_matches_individual_helpers(self):
+        """Should agree with extract_mime_type and extract_base64_data."""
+        for data_url in [
+            "data:image/png;base64,ABC123==",
+            "data:image/gif;charset=utf-8,ABC123==",
+            "data:image/png;base64,",
+            "ABC123==",
+        ]:
+            assert split_data_url(data_url) == (
+                extract_mime_type(data_url),
+                extract_base64_data(data_url),
+            )
+
+    def test_header_longer_than_128_characters(self):
+        """Should find the payload after media-type parameters of any length."""
+        params = "".join(f";param{i}=value{i}" for i in range(12))
+        data_url = f"data:image/jpeg{params};base64,XYZ789=="
+        assert data_url.index(",") > 128
+
+        assert split_data_url(data_url) == ("image/jpeg", "XYZ789==")
+
+
 # =============================================================================
 # Tests for create_image_thumbnail
 # =============================================================================
@@ -257,6 +312,35 @@ class TestCreateImageThumbnail:
         # Output should be RGB (converted from RGBA)
         assert img.mode in ("RGB", "P")
 
+    def test_flattens_transparency_onto_white(self):
+        """Should composite fully transparent pixels onto white after downscaling."""
+        img = Image.new("RGBA", (400, 200), (0, 0, 0, 0))
+        img.paste((0, 0, 255, 255), (200, 0, 400, 200))
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        base64_data = base64.b64encode(buffer.getvalue()).decode("ascii")
+
+        result = create_image_thumbnail(base64_data, max_size=64)
+
+        thumb = Image.open(io.BytesIO(base64.b64decode(result.split(",")[1]))).convert("RGB")
+        assert thumb.size == (64, 32)
+        assert thumb.getpixel((2, 16)) == (255, 255, 255)
+        assert thumb.getpixel((61, 16)) == (0, 0, 255)
+
+    def test_opaque_rgba_skips_flattening(self):
+        """Should treat fully opaque RGBA as RGB and skip the white composite."""
+        img = Image.new("RGBA", (40, 20), (0, 0, 255, 255))
+        buffer = io.BytesIO()
+        img.save(buffer, format="PNG")
+        base64_data = base64.b64encode(buffer.getvalue()).decode("ascii")
+
+        with patch("utils.ai_logging.Image.new", wraps=Image.new) as new_image:
+            result = create_image_thumbnail(base64_data)
+
+        new_image.assert_not_called()
+        thumb = Image.open(io.BytesIO(base64.b64decode(result.split(",")[1])))
+        assert thumb.convert("RGB").getpixel((0, 0)) == (0, 0, 255)
+
     def test_handles_palette_mode_image(self):
         """Should handle palette (P) mode images."""
         # Create a palette mode image
@@ -296,6 +380,16 @@ class TestCreateImageThumbnail:
         assert img.width <= 10
         assert img.height <= 10
 
+    def test_accepts_line_wrapped_base64(self):
+        """Should decode base64 wrapped with line breaks, as base64.encodebytes emits."""
+        wrapped = base64.encodebytes(base64.b64decode(create_test_image(200, 100))).decode("ascii")
+        assert "\n" in wrapped.rstrip()
+
+        result = create_image_thumbnail(wrapped, max_size=64)
+
+        img = Image.open(io.BytesIO(base64.b64decode(result.split(",")[1])))
+        assert img.size == (64, 32)
+
     def test_returns_empty_string_on_invalid_base64(self):
         """Should return empty string for invalid base64 data."""
         invalid_data = "not-valid-base64!!!"
@@ -321,6 +415,17 @@ class TestCreateImageThumbnail:
             assert img.width <= max_size
             assert img.height <= max_size
 
+    def test_large_jpeg_thumbnail_size(self):
+        """Should produce the exact thumbnail size when JPEG draft decoding kicks in."""
+        buffer = io.BytesIO()
+        Image.new("RGB", (1600, 800), (0, 128, 255)).save(buffer, format="JPEG")
+        jpeg_data = base64.b64encode(buffer.getvalue()).decode("ascii")
+
+        result = create_image_thumbnail(jpeg_data, max_size=64)
+
+        img = Image.open(io.BytesIO(base64.b64decode(result.split(",")[1])))
+        assert img.size == (64, 32)
+
 
 # =============================================================================
 # Tests for get_image_metadata
@@ -384,14 +489,39 @@ class TestGetImageMetadata:
         assert result["width"] == 400
         assert result["height"] == 100
 
-    def test_returns_defaults_on_invalid_base64(self):
-        """Should return defaults for invalid base64.
+    def test_accepts_line_wrapped_base64(self):
+        """Should read dimensions from base64 wrapped with line breaks."""
+        image_bytes = base64.b64decode(create_test_image(10, 7))
+        wrapped = base64.encodebytes(image_bytes).decode("ascii")
+        assert "\n" in wrapped.rstrip()
+
+        result = get_image_metadata(wrapped)
+
+        assert (result["width"], result["height"]) == (10, 7)
+        assert result["sizeBytes"] == len(image_bytes)
+
+    def test_wrapped_large_payload_size(self):
+        """Should report the exact size when the header fast path sees wrapped base64."""
+        noise = Image.frombytes("RGB", (64, 48), random.Random(1).randbytes(64 * 48 * 3))
+        buffer = io.BytesIO()
+        noise.save(buffer, format="PNG")
+        wrapped = base64.encodebytes(buffer.getvalue()).decode("ascii")
 
-        Note: The source function has a bug where the fallback handler also
-        tries to decode base64, which fails for truly invalid input. This test
-        documents the current behavior - the function raises on completely
-        invalid base64 strings, but handles corrupted-but-decodable data.
-        """
+        result = get_image_metadata(wrapped)
+
+        assert (result["width"], result["height"]) == (64, 48)
+        assert result["sizeBytes"] == len(buffer.getvalue())
+
+    def test_undecodable_base64_does_not_raise(self):
+        """Should return defaults instead of raising when lenient decoding also fails."""
+        result = get_image_metadata("not-valid-base64!!!")
+
+        assert result["width"] == 0
+        assert result["height"] == 0
+        assert result["sizeBytes"] >= 0
+
+    def test_returns_defaults_on_invalid_base64(self):
+        """Should return zero dimensions for base64 that decodes to a non-image."""
         # Valid base64 but not a valid image - this is the recoverable case
         recoverable_data = base64.b64encode(b"not an image but valid base64").decode()
         result = get_image_metadata(recoverable_data)
@@ -421,6 +551,48 @@ class TestGetImageMetadata:
         assert result["sizeBytes"] == 0
 
 
+def encode_image(img: Image.Image, format: str, **params) -> bytes:
+    """Save img in the given format and return the encoded bytes."""
+    buffer = io.BytesIO()
+    img.save(buffer, format=format, **params)
+    return buffer.getvalue()
+
+
+class TestPeekDimensions:
+    """Tests for _peek_dimensions header parsing."""
+
+    @pytest.mark.parametrize("format", ["PNG", "JPEG"])
+    def test_reads_header_dimensions(self, format):
+        """Should read width and height from PNG and JPEG headers."""
+        image_bytes = encode_image(Image.new("RGB", (37, 21)), format)
+        assert _peek_dimensions(image_bytes) == (37, 21)
+
+    def test_skips_jpeg_app_segments(self):
+        """Should walk past EXIF segments to the start-of-frame marker."""
+        exif = Image.Exif()
+        exif[0x010E] = "x" * 2000  # ImageDescription
+        image_bytes = encode_image(Image.new("RGB", (50, 40)), "JPEG", exif=exif)
+        assert _peek_dimensions(image_bytes) == (50, 40)
+
+    def test_returns_none_for_truncated_or_unknown(self):
+        """Should return None when the header is missing so callers fall back to PIL."""
+        jpeg = encode_image(Image.new("RGB", (8, 8)), "JPEG")
+        assert _peek_dimensions(jpeg[:4]) is None
+        assert _peek_dimensions(encode_image(Image.new("RGB", (8, 8)), "GIF")) is None
+
+    def test_metadata_for_large_payload(self):
+        """Should report header dimensions and exact size without a full decode."""
+        noise = Image.frombytes("RGB", (64, 48), random.Random(0).randbytes(64 * 48 * 3))
+        image_bytes = encode_image(noise, "PNG")
+        base64_data = base64.b64encode(image_bytes).decode("ascii")
+        assert len(base64_data) > 1024
+
+        result = get_image_metadata(base64_data)
+
+        assert (result["width"], result["height"]) == (64, 48)
+        assert result["sizeBytes"] == len(image_bytes)
+
+
 # =============================================================================
 # Tests for format_image_for_log
 # =============================================================================
@@ -502,6 +674,15 @@ class TestFormatImageForLog:
         # Should maintain 2:1 aspect ratio
         assert thumb_img.width > thumb_img.height
 
+    def test_decodes_base64_once(self, data_url_png):
+        """Should decode the payload once and share it between metadata and thumbnail."""
+        with patch("utils.ai_logging.pybase64.b64decode", wraps=pybase64.b64decode) as decode:
+            result = format_image_for_log(data_url_png)
+
+        assert decode.call_count == 1
+        assert result["width"] == 10
+        assert result["thumbnail"].startswith("data:image/png;base64,")
+
 
 # =============================================================================
 # Tests for log_image_inputs
@@ -522,6 +703,20 @@ class TestLogImageInputs:
         assert "sourceImage" in logged_data
         assert "maskImage" not in logged_data
 
+    def test_skips_work_when_info_disabled(self, data_url_png):
+        """Should not extract metadata when the logger drops INFO records."""
+        quiet_logger = logging.getLogger("test_ai_logging.quiet")
+        quiet_logger.setLevel(logging.WARNING)
+
+        with patch("utils.ai_logging.get_image_metadata") as get_metadata:
+            log_image_inputs(quiet_logger, source_image=data_url_png)
+            log_contents_images(
+                quiet_logger,
+                [{"parts": [{"inline_data": {"mime_type": "image/png", "data": "AAAA"}}]}],
+            )
+
+        get_metadata.assert_not_called()
+
     def test_logs_both_images(self, mock_logger, data_url_png):
         """Should log both source and mask images when both provided."""
         log_image_inputs(
@@ -607,20 +802,26 @@ class TestExtractImagesFromContents:
         assert len(result) == 1
         assert result[0] == ("image/png", "ABC123==")
 
-    def test_extracts_from_object_structure(self):
-        """Should extract images from object-based contents (Gemini SDK)."""
-        # Create mock objects that mimic Gemini API structure
-        mock_inline_data = MagicMock()
-        mock_inline_data.mime_type = "image/jpeg"
-        mock_inline_data.data = "XYZ789=="
+    def test_extracts_from_mixed_structure(self):
+        """Should fall back to per-part checks when dict contents hold SDK parts."""
+        sdk_part = SimpleNamespace(
+            inline_data=SimpleNamespace(mime_type="image/jpeg", data="XYZ789==")
+        )
+        contents = [
+            {"parts": [{"inline_data": {"mime_type": "image/png", "data": "ABC123=="}}]},
+            {"parts": [sdk_part]},
+        ]
 
-        mock_part = MagicMock()
-        mock_part.inline_data = mock_inline_data
+        result = extract_images_from_contents(contents)
 
-        mock_content = MagicMock()
-        mock_content.parts = [mock_part]
+        assert result == [("image/png", "ABC123=="), ("image/jpeg", "XYZ789==")]
 
-        contents = [mock_content]
+    def test_extracts_from_object_structure(self):
+        """Should extract images from object-based contents (Gemini SDK)."""
+        # Plain attribute objects that mimic the Gemini API structure
+        inline_data = SimpleNamespace(mime_type="image/jpeg", data="XYZ789==")
+        part = SimpleNamespace(inline_data=inline_data)
+        contents = [SimpleNamespace(parts=[part])]
 
         result = extract_images_from_contents(contents)
 
@@ -727,10 +928,7 @@ class TestExtractImagesFromContents:
 
     def test_handles_none_parts(self):
         """Should handle content with None parts."""
-        mock_content = MagicMock()
-        mock_content.parts = None
-
-        result = extract_images_from_contents([mock_content])
+        result = extract_images_from_contents([SimpleNamespace(parts=None)])
 
         assert result == []
 
@@ -9,74 +9,23 @@ These tests ensure the Python server has comprehensive coverage before
 Express deprecation.
 """
 
-import os
-import sys
-from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch
-
 import pytest
-from fastapi.testclient import TestClient
-
-# Add parent directory to path for imports
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from main import app
-
-
-# =============================================================================
-# Test Client Fixture
-# =============================================================================
-
-
-@pytest.fixture
-def client():
-    """Create a test client for the FastAPI app."""
-    return TestClient(app)
-
-
-# Valid base64 image for testing (1x1 transparent PNG)
-VALID_BASE64_IMAGE = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
-
-
-# =============================================================================
-# SSE Event Parser
-# =============================================================================
-
-
-def parse_sse_events(response_text: str) -> list[dict]:
-    """
-    Parse SSE response text into a list of events.
-
-    Each SSE event has format:
-    event: <type>
-    data: <json>
-
-    (blank line separates events)
-    """
-    import json
-
-    events = []
-    current_event = {}
-
-    for line in response_text.split("\n"):
-        line = line.strip()
-        if line.startswith("event:"):
-            current_event["type"] = line[6:].strip()
-        elif line.startswith("data:"):
-            try:
-                current_event["data"] = json.loads(line[5:].strip())
-            except json.JSONDecodeError:
-                current_event["data"] = line[5:].strip()
-        elif line == "" and current_event:
-            if "type" in current_event and "data" in current_event:
-                events.append(current_event)
-            current_event = {}
-
-    # Handle last event if no trailing newline
-    if "type" in current_event and "data" in current_event:
-        events.append(current_event)
-
-    return events
+from pydantic import ValidationError
+
+from schemas import AgenticEditRequest, GenerateImageRequest, InpaintRequest
+from tests.helpers import JSON_HEADERS, partial_coro, post_json
+from tests.genai_responses import make_image_response
+from tests.payloads import (
+    AGENTIC_EDIT_MISSING_PROMPT,
+    AGENTIC_EDIT_OK,
+    GENERATE_IMAGE_MISSING_MODEL,
+    GENERATE_IMAGE_OK,
+    INPAINT_MISSING_MASK_IMAGE,
+    INPAINT_OK,
+    VALID_BASE64_DATA,
+    VALID_BASE64_IMAGE,
+)
+from tests.sse_events import async_sse_summary
 
 
 # =============================================================================
@@ -287,105 +236,88 @@ class TestShadowMetricsResetEndpoint:
 class TestAiGenerateImageRedirect:
     """Tests for POST /api/ai/generate-image (redirects to /api/images/generate)."""
 
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        """Configure a fake Gemini API key for every test in this class."""
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
     def test_generate_image_missing_api_key(self, client, monkeypatch):
         """POST /api/ai/generate-image should return 500 without API key."""
         monkeypatch.delenv("GEMINI_API_KEY", raising=False)
         monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
 
-        response = client.post(
-            "/api/ai/generate-image",
-            json={
-                "model": "gemini-3-pro-image-preview",
-                "sourceImage": VALID_BASE64_IMAGE,
-                "prompt": "Test prompt",
-            },
-        )
+        response = post_json(client, "/api/ai/generate-image", GENERATE_IMAGE_OK)
 
         assert response.status_code == 500
-        assert "GEMINI_API_KEY" in response.json()["detail"]
+        assert "GEMINI_API_KEY" in response.text
 
     def test_generate_image_validation_missing_model(self, client):
         """POST /api/ai/generate-image should return 422 without model."""
-        response = client.post(
-            "/api/ai/generate-image",
-            json={
-                "sourceImage": VALID_BASE64_IMAGE,
-                "prompt": "Test prompt",
-            },
+        response = post_json(
+            client, "/api/ai/generate-image", GENERATE_IMAGE_MISSING_MODEL
         )
 
         assert response.status_code == 422
 
-    def test_generate_image_validation_missing_source_image(self, client):
-        """POST /api/ai/generate-image should return 422 without sourceImage."""
-        response = client.post(
-            "/api/ai/generate-image",
-            json={
-                "model": "gemini-3-pro-image-preview",
-                "prompt": "Test prompt",
-            },
-        )
+    @pytest.mark.parametrize("missing", ["model", "sourceImage", "prompt"])
+    def test_generate_image_schema_rejects_missing_field(self, missing):
+        """GenerateImageRequest should reject a body missing any required field."""
+        body = {
+            "model": "gemini-3-pro-image-preview",
+            "sourceImage": VALID_BASE64_IMAGE,
+            "prompt": "Test prompt",
+        }
+        del body[missing]
 
-        assert response.status_code == 422
+        with pytest.raises(ValidationError):
+            GenerateImageRequest.model_validate(body)
 
-    def test_generate_image_validation_missing_prompt(self, client):
-        """POST /api/ai/generate-image should return 422 without prompt."""
-        response = client.post(
-            "/api/ai/generate-image",
-            json={
+    def test_generate_image_schema_accepts_long_data_url_header(self):
+        """GenerateImageRequest should find ";base64," past 128 header characters."""
+        params = "".join(f";param{i}=value{i}" for i in range(12))
+        source_image = f"data:image/png{params};base64,{VALID_BASE64_DATA}"
+        assert source_image.index(";base64,") > 128
+
+        request = GenerateImageRequest.model_validate(
+            {
                 "model": "gemini-3-pro-image-preview",
-                "sourceImage": VALID_BASE64_IMAGE,
-            },
+                "sourceImage": source_image,
+                "prompt": "Test prompt",
+            }
         )
 
-        assert response.status_code == 422
-
-    @pytest.mark.asyncio
-    async def test_generate_image_success(self, client, monkeypatch):
-        """POST /api/ai/generate-image should return image on success."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
-        # Create mock response with inline_data
-        mock_inline_data = MagicMock()
-        mock_inline_data.mime_type = "image/png"
-        mock_inline_data.data = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
+        assert request.sourceImage == source_image
 
-        mock_part = MagicMock()
-        mock_part.inline_data = mock_inline_data
-
-        mock_content = MagicMock()
-        mock_content.parts = [mock_part]
+    @pytest.mark.parametrize(
+        "source_image",
+        ["image/png;base64,AAAA", "data:image/png,AAAA", "data:image/png;base64"],
+    )
+    def test_generate_image_schema_rejects_non_base64_data_url(self, source_image):
+        """GenerateImageRequest should reject images that are not base64 data URLs."""
+        with pytest.raises(ValidationError):
+            GenerateImageRequest.model_validate(
+                {
+                    "model": "gemini-3-pro-image-preview",
+                    "sourceImage": source_image,
+                    "prompt": "Test prompt",
+                }
+            )
 
-        mock_candidate = MagicMock()
-        mock_candidate.content = mock_content
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_generate_image_success(self, async_client, patched_genai):
+        """POST /api/ai/generate-image should return image on success."""
+        mock_response = make_image_response(VALID_BASE64_DATA)
 
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
+        patched_genai.aio.models.generate_content = partial_coro(mock_response)
 
-        with (
-            patch("google.genai.Client") as mock_client_class,
-            patch("google.genai.types") as mock_types,
-        ):
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            mock_types.GenerateContentConfig.return_value = MagicMock()
-            mock_client.aio.models.generate_content = AsyncMock(
-                return_value=mock_response
-            )
-
-            response = client.post(
-                "/api/ai/generate-image",
-                json={
-                    "model": "gemini-3-pro-image-preview",
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "prompt": "Make it blue",
-                },
-            )
+        response = await post_json(
+            async_client, "/api/ai/generate-image", GENERATE_IMAGE_OK
+        )
 
-            assert response.status_code == 200
-            data = response.json()
-            assert "imageData" in data
-            assert data["imageData"].startswith("data:image/")
+        assert response.status_code == 200
+        data = response.json()
+        assert "imageData" in data
+        assert data["imageData"].startswith("data:image/")
 
 
 # =============================================================================
@@ -396,64 +328,43 @@ class TestAiGenerateImageRedirect:
 class TestAiInpaintRedirect:
     """Tests for POST /api/ai/inpaint (redirects to /api/images/inpaint)."""
 
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        """Configure a fake Gemini API key for every test in this class."""
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
     def test_inpaint_missing_api_key(self, client, monkeypatch):
         """POST /api/ai/inpaint should return 500 without API key."""
         monkeypatch.delenv("GEMINI_API_KEY", raising=False)
         monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
 
-        response = client.post(
-            "/api/ai/inpaint",
-            json={
-                "sourceImage": VALID_BASE64_IMAGE,
-                "maskImage": VALID_BASE64_IMAGE,
-                "prompt": "Remove object",
-            },
-        )
+        response = post_json(client, "/api/ai/inpaint", INPAINT_OK)
 
         assert response.status_code == 500
-        assert "GEMINI_API_KEY" in response.json()["detail"]
-
-    def test_inpaint_validation_missing_source_image(self, client):
-        """POST /api/ai/inpaint should return 422 without sourceImage."""
-        response = client.post(
-            "/api/ai/inpaint",
-            json={
-                "maskImage": VALID_BASE64_IMAGE,
-                "prompt": "Remove object",
-            },
-        )
-
-        assert response.status_code == 422
+        assert "GEMINI_API_KEY" in response.text
 
     def test_inpaint_validation_missing_mask_image(self, client):
         """POST /api/ai/inpaint should return 422 without maskImage."""
-        response = client.post(
-            "/api/ai/inpaint",
-            json={
-                "sourceImage": VALID_BASE64_IMAGE,
-                "prompt": "Remove object",
-            },
-        )
+        response = post_json(client, "/api/ai/inpaint", INPAINT_MISSING_MASK_IMAGE)
 
         assert response.status_code == 422
 
-    def test_inpaint_validation_missing_prompt(self, client):
-        """POST /api/ai/inpaint should return 422 without prompt."""
-        response = client.post(
-            "/api/ai/inpaint",
-            json={
-                "sourceImage": VALID_BASE64_IMAGE,
-                "maskImage": VALID_BASE64_IMAGE,
-            },
-        )
+    @pytest.mark.parametrize("missing", ["sourceImage", "maskImage", "prompt"])
+    def test_inpaint_schema_rejects_missing_field(self, missing):
+        """InpaintRequest should reject a body missing any required field."""
+        body = {
+            "sourceImage": VALID_BASE64_IMAGE,
+            "maskImage": VALID_BASE64_IMAGE,
+            "prompt": "Remove object",
+        }
+        del body[missing]
 
-        assert response.status_code == 422
+        with pytest.raises(ValidationError):
+            InpaintRequest.model_validate(body)
 
-    @pytest.mark.asyncio
-    async def test_inpaint_returns_sse_stream(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_inpaint_returns_sse_stream(self, async_client, fake_graph):
         """POST /api/ai/inpaint should return SSE stream."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
         # Mock final state from the graph
         mock_final_state = {
             "current_result": VALID_BASE64_IMAGE,
@@ -461,21 +372,11 @@ class TestAiInpaintRedirect:
             "current_iteration": 1,
         }
 
-        async def mock_astream(*args, **kwargs):
-            yield ("values", mock_final_state)
-
-        with patch("main.agentic_edit_graph") as mock_graph:
-            mock_graph.astream = mock_astream
-
-            response = client.post(
-                "/api/ai/inpaint",
-                json={
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "maskImage": VALID_BASE64_IMAGE,
-                    "prompt": "Remove this object",
-                },
-            )
+        fake_graph([("values", mock_final_state)])
 
+        async with async_client.stream(
+            "POST", "/api/ai/inpaint", content=INPAINT_OK, headers=JSON_HEADERS
+        ) as response:
             # SSE always returns 200
             assert response.status_code == 200
             assert (
@@ -483,12 +384,11 @@ class TestAiInpaintRedirect:
             )
 
             # Parse SSE events
-            events = parse_sse_events(response.text)
-            event_types = [e["type"] for e in events]
+            stream = await async_sse_summary(response)
 
-            # Should have progress and complete events
-            assert "progress" in event_types
-            assert "complete" in event_types
+        # Should have progress and complete events
+        assert "progress" in stream.types
+        assert "complete" in stream.types
 
 
 # =============================================================================
@@ -499,49 +399,44 @@ class TestAiInpaintRedirect:
 class TestAiAgenticEditRedirect:
     """Tests for POST /api/ai/agentic/edit (redirects to /api/agentic/edit)."""
 
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        """Configure a fake Gemini API key for every test in this class."""
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
     def test_agentic_edit_missing_api_key(self, client, monkeypatch):
         """POST /api/ai/agentic/edit should return 500 without API key."""
         monkeypatch.delenv("GEMINI_API_KEY", raising=False)
         monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
 
-        response = client.post(
-            "/api/ai/agentic/edit",
-            json={
-                "sourceImage": VALID_BASE64_IMAGE,
-                "prompt": "Make it blue",
-            },
-        )
+        response = post_json(client, "/api/ai/agentic/edit", AGENTIC_EDIT_OK)
 
         assert response.status_code == 500
-        assert "GEMINI_API_KEY" in response.json()["detail"]
-
-    def test_agentic_edit_validation_missing_source_image(self, client):
-        """POST /api/ai/agentic/edit should return 422 without sourceImage."""
-        response = client.post(
-            "/api/ai/agentic/edit",
-            json={
-                "prompt": "Make it blue",
-            },
-        )
-
-        assert response.status_code == 422
+        assert "GEMINI_API_KEY" in response.text
 
     def test_agentic_edit_validation_missing_prompt(self, client):
         """POST /api/ai/agentic/edit should return 422 without prompt."""
-        response = client.post(
-            "/api/ai/agentic/edit",
-            json={
-                "sourceImage": VALID_BASE64_IMAGE,
-            },
+        response = post_json(
+            client, "/api/ai/agentic/edit", AGENTIC_EDIT_MISSING_PROMPT
         )
 
         assert response.status_code == 422
 
-    @pytest.mark.asyncio
-    async def test_agentic_edit_returns_sse_stream(self, client, monkeypatch):
-        """POST /api/ai/agentic/edit should return SSE stream."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+    @pytest.mark.parametrize("missing", ["sourceImage", "prompt"])
+    def test_agentic_edit_schema_rejects_missing_field(self, missing):
+        """AgenticEditRequest should reject a body missing any required field."""
+        body = {
+            "sourceImage": VALID_BASE64_IMAGE,
+            "prompt": "Make it blue",
+        }
+        del body[missing]
+
+        with pytest.raises(ValidationError):
+            AgenticEditRequest.model_validate(body)
 
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_agentic_edit_returns_sse_stream(self, async_client, fake_graph):
+        """POST /api/ai/agentic/edit should return SSE stream."""
         # Mock final state from the graph
         mock_final_state = {
             "current_result": VALID_BASE64_IMAGE,
@@ -549,27 +444,25 @@ class TestAiAgenticEditRedirect:
             "current_iteration": 1,
         }
 
-        async def mock_astream(*args, **kwargs):
-            yield (
-                "custom",
-                {
-                    "step": "planning",
-                    "message": "Planning the edit...",
-                },
-            )
-            yield ("values", mock_final_state)
-
-        with patch("main.agentic_edit_graph") as mock_graph:
-            mock_graph.astream = mock_astream
-
-            response = client.post(
-                "/api/ai/agentic/edit",
-                json={
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "prompt": "Make it blue",
-                },
-            )
+        fake_graph(
+            [
+                (
+                    "custom",
+                    {
+                        "step": "planning",
+                        "message": "Planning the edit...",
+                    },
+                ),
+                ("values", mock_final_state),
+            ]
+        )
 
+        async with async_client.stream(
+            "POST",
+            "/api/ai/agentic/edit",
+            content=AGENTIC_EDIT_OK,
+            headers=JSON_HEADERS,
+        ) as response:
             # SSE always returns 200
             assert response.status_code == 200
             assert (
@@ -577,72 +470,60 @@ class TestAiAgenticEditRedirect:
             )
 
             # Parse SSE events
-            events = parse_sse_events(response.text)
-            event_types = [e["type"] for e in events]
+            stream = await async_sse_summary(response)
 
-            # Should have progress and complete events
-            assert "progress" in event_types
-            assert "complete" in event_types
+        # Should have progress and complete events
+        assert "progress" in stream.types
+        assert "complete" in stream.types
 
-            # Complete event should have image data
-            complete_event = next(e for e in events if e["type"] == "complete")
-            assert "imageData" in complete_event["data"]
+        # Complete event should have image data
+        assert "imageData" in stream.find("complete")
 
-    @pytest.mark.asyncio
-    async def test_agentic_edit_with_mask_image(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_agentic_edit_with_mask_image(self, async_client, fake_graph):
         """POST /api/ai/agentic/edit should accept optional maskImage."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
         mock_final_state = {
             "current_result": VALID_BASE64_IMAGE,
             "refined_prompt": "Edit the masked area",
             "current_iteration": 1,
         }
 
-        async def mock_astream(*args, **kwargs):
-            yield ("values", mock_final_state)
-
-        with patch("main.agentic_edit_graph") as mock_graph:
-            mock_graph.astream = mock_astream
+        fake_graph([("values", mock_final_state)])
 
-            response = client.post(
-                "/api/ai/agentic/edit",
-                json={
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "maskImage": VALID_BASE64_IMAGE,
-                    "prompt": "Replace this area",
-                },
-            )
+        response = await post_json(
+            async_client,
+            "/api/ai/agentic/edit",
+            {
+                "sourceImage": VALID_BASE64_IMAGE,
+                "maskImage": VALID_BASE64_IMAGE,
+                "prompt": "Replace this area",
+            },
+        )
 
-            assert response.status_code == 200
+        assert response.status_code == 200
 
-    @pytest.mark.asyncio
-    async def test_agentic_edit_with_max_iterations(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_agentic_edit_with_max_iterations(self, async_client, fake_graph):
         """POST /api/ai/agentic/edit should accept optional maxIterations."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
         mock_final_state = {
             "current_result": VALID_BASE64_IMAGE,
             "refined_prompt": "Edit prompt",
             "current_iteration": 1,
         }
 
-        async def mock_astream(*args, **kwargs):
-            yield ("values", mock_final_state)
-
-        with patch("main.agentic_edit_graph") as mock_graph:
-            mock_graph.astream = mock_astream
+        fake_graph([("values", mock_final_state)])
 
-            response = client.post(
-                "/api/ai/agentic/edit",
-                json={
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "prompt": "Make it blue",
-                    "maxIterations": 5,
-                },
-            )
+        response = await post_json(
+            async_client,
+            "/api/ai/agentic/edit",
+            {
+                "sourceImage": VALID_BASE64_IMAGE,
+                "prompt": "Make it blue",
+                "maxIterations": 5,
+            },
+        )
 
-            assert response.status_code == 200
+        assert response.status_code == 200
 
 
 # =============================================================================
@@ -653,64 +534,32 @@ class TestAiAgenticEditRedirect:
 class TestEchoEndpoint:
     """Tests for POST /api/echo endpoint."""
 
-    def test_echo_returns_200(self, client):
-        """POST /api/echo should return 200 status code."""
-        response = client.post(
+    def test_echo_contract(self, client):
+        """POST /api/echo should echo message and data with server id and timestamp."""
+        response = post_json(
+            client,
             "/api/echo",
-            json={"message": "Hello"},
+            {
+                "message": "Hello",
+                "data": {"key": "value", "number": 42},
+            },
         )
         assert response.status_code == 200
-
-    def test_echo_returns_received_message(self, client):
-        """POST /api/echo should return the received message."""
-        response = client.post(
-            "/api/echo",
-            json={"message": "Test message"},
-        )
-        data = response.json()
-
-        assert data["received"] == "Test message"
-
-    def test_echo_returns_server_identifier(self, client):
-        """POST /api/echo should identify as Python server."""
-        response = client.post(
-            "/api/echo",
-            json={"message": "Hello"},
-        )
         data = response.json()
 
+        assert data["received"] == "Hello"
+        assert data["data"] == {"key": "value", "number": 42}
         assert "server" in data
         assert "python" in data["server"].lower() or "fastapi" in data["server"].lower()
-
-    def test_echo_returns_timestamp(self, client):
-        """POST /api/echo should return a timestamp."""
-        response = client.post(
-            "/api/echo",
-            json={"message": "Hello"},
-        )
-        data = response.json()
-
         assert "timestamp" in data
         assert len(data["timestamp"]) > 0
 
-    def test_echo_with_optional_data(self, client):
-        """POST /api/echo should echo optional data field."""
-        response = client.post(
-            "/api/echo",
-            json={
-                "message": "Hello",
-                "data": {"key": "value", "number": 42},
-            },
-        )
-        data = response.json()
-
-        assert data["data"] == {"key": "value", "number": 42}
-
     def test_echo_validation_missing_message(self, client):
         """POST /api/echo should return 422 without message."""
-        response = client.post(
+        response = post_json(
+            client,
             "/api/echo",
-            json={},
+            {},
         )
 
         assert response.status_code == 422
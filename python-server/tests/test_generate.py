@@ -1,28 +1,35 @@
 """Tests for POST /api/ai/generate endpoint."""
 
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, patch, MagicMock
+from types import SimpleNamespace
 
-# Import app after setting up mocks
-import sys
-from pathlib import Path
+from pydantic import ValidationError
 
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from main import app
 from schemas import GenerateTextRequest, GenerateTextResponse
+from tests.helpers import async_raises, partial_coro
+
 
+def make_text_response(text=None, thinking=None, function_call=None):
+    """Build a Gemini-style response exposing candidates[0].content.parts.
 
-@pytest.fixture
-def client():
-    """Create a test client."""
-    return TestClient(app)
+    A thinking part (thought=True) is emitted first when ``thinking`` is given,
+    followed by a single regular part carrying ``text`` and ``function_call``.
+    """
+    parts = []
+    if thinking is not None:
+        parts.append(SimpleNamespace(thought=True, text=thinking, function_call=None))
+    parts.append(SimpleNamespace(thought=False, text=text, function_call=function_call))
+    return SimpleNamespace(candidates=[SimpleNamespace(content=SimpleNamespace(parts=parts))])
 
 
 class TestGenerateEndpoint:
     """Tests for POST /api/ai/generate."""
 
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        """Configure a fake Gemini API key for every test in this class."""
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
     def test_missing_api_key(self, client, monkeypatch):
         """Should return 500 if API key is not configured."""
         monkeypatch.delenv("GEMINI_API_KEY", raising=False)
@@ -37,222 +44,129 @@ class TestGenerateEndpoint:
         )
 
         assert response.status_code == 500
-        assert "GEMINI_API_KEY" in response.json()["detail"]
+        assert "GEMINI_API_KEY" in response.text
 
     def test_validation_missing_model(self, client):
         """Should return 422 if model is missing."""
         response = client.post(
-            "/api/ai/generate",
-            json={
-                "contents": [{"parts": [{"text": "Hello"}]}],
-            },
+            "/api/ai/generate", json={"contents": [{"parts": [{"text": "Hello"}]}]}
         )
 
         assert response.status_code == 422
 
-    def test_validation_missing_contents(self, client):
-        """Should return 422 if contents is missing."""
-        response = client.post(
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_successful_generation(self, async_client, patched_genai):
+        """Should return generated text on success."""
+        mock_response = make_text_response("Hello, I'm Gemini!")
+
+        patched_genai.aio.models.generate_content = partial_coro(mock_response)
+
+        response = await async_client.post(
             "/api/ai/generate",
             json={
                 "model": "gemini-3-flash-preview",
+                "contents": [{"parts": [{"text": "Hello"}]}],
             },
         )
 
-        assert response.status_code == 422
+        assert response.status_code == 200
+        data = response.json()
+        assert data["text"] == "Hello, I'm Gemini!"
+        assert data["thinking"] == ""
+        # functionCall is excluded when None (to match Express behavior)
+        assert "functionCall" not in data
 
-    def test_validation_empty_contents(self, client):
-        """Should return 422 if contents is empty."""
-        response = client.post(
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_generation_with_thinking(self, async_client, patched_genai):
+        """Should return thinking text when available."""
+        mock_response = make_text_response(
+            "The answer is 42.", thinking="Let me think about this..."
+        )
+
+        patched_genai.aio.models.generate_content = partial_coro(mock_response)
+
+        response = await async_client.post(
             "/api/ai/generate",
             json={
                 "model": "gemini-3-flash-preview",
-                "contents": [],
+                "contents": [{"parts": [{"text": "What is the answer?"}]}],
+                "includeThoughts": True,
+                "thinkingBudget": 4096,
             },
         )
 
-        assert response.status_code == 422
-
-    @pytest.mark.asyncio
-    async def test_successful_generation(self, client, monkeypatch):
-        """Should return generated text on success."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
-        # Create mock response
-        mock_part = MagicMock()
-        mock_part.thought = False
-        mock_part.text = "Hello, I'm Gemini!"
-        mock_part.function_call = None
+        assert response.status_code == 200
+        data = response.json()
+        assert data["text"] == "The answer is 42."
+        assert data["thinking"] == "Let me think about this..."
 
-        mock_content = MagicMock()
-        mock_content.parts = [mock_part]
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_generation_with_function_call(self, async_client, patched_genai):
+        """Should return function call when present."""
+        mock_response = make_text_response(
+            function_call=SimpleNamespace(
+                name="get_weather", args={"location": "San Francisco"}
+            )
+        )
 
-        mock_candidate = MagicMock()
-        mock_candidate.content = mock_content
+        patched_genai.aio.models.generate_content = partial_coro(mock_response)
 
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
+        response = await async_client.post(
+            "/api/ai/generate",
+            json={
+                "model": "gemini-3-flash-preview",
+                "contents": [{"parts": [{"text": "What's the weather?"}]}],
+                "tools": [
+                    {
+                        "function_declarations": [
+                            {
+                                "name": "get_weather",
+                                "description": "Get weather for a location",
+                            }
+                        ]
+                    }
+                ],
+            },
+        )
 
-        # Patch the genai client and types (imported inside the function)
-        with (
-            patch("google.genai.Client") as mock_client_class,
-            patch("google.genai.types") as mock_types,
-        ):
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
+        assert response.status_code == 200
+        data = response.json()
+        assert data["functionCall"] is not None
+        assert data["functionCall"]["name"] == "get_weather"
+        assert data["functionCall"]["args"]["location"] == "San Francisco"
 
-            # Make generate_content async
-            mock_client.aio.models.generate_content = AsyncMock(
-                return_value=mock_response
-            )
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_reuses_genai_client(self, async_client, patched_genai, fake_genai):
+        """Should construct the genai client once and reuse it across requests."""
+        patched_genai.aio.models.generate_content = partial_coro(make_text_response("Hi"))
 
-            response = client.post(
+        for _ in range(2):
+            response = await async_client.post(
                 "/api/ai/generate",
                 json={
                     "model": "gemini-3-flash-preview",
                     "contents": [{"parts": [{"text": "Hello"}]}],
                 },
             )
-
             assert response.status_code == 200
-            data = response.json()
-            assert data["text"] == "Hello, I'm Gemini!"
-            assert data["thinking"] == ""
-            # functionCall is excluded when None (to match Express behavior)
-            assert "functionCall" not in data
-
-    @pytest.mark.asyncio
-    async def test_generation_with_thinking(self, client, monkeypatch):
-        """Should return thinking text when available."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
 
-        # Create mock response with thinking
-        mock_thinking_part = MagicMock()
-        mock_thinking_part.thought = True
-        mock_thinking_part.text = "Let me think about this..."
-
-        mock_text_part = MagicMock()
-        mock_text_part.thought = False
-        mock_text_part.text = "The answer is 42."
-        mock_text_part.function_call = None
-
-        mock_content = MagicMock()
-        mock_content.parts = [mock_thinking_part, mock_text_part]
-
-        mock_candidate = MagicMock()
-        mock_candidate.content = mock_content
-
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
-
-        with (
-            patch("google.genai.Client") as mock_client_class,
-            patch("google.genai.types") as mock_types,
-        ):
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            mock_client.aio.models.generate_content = AsyncMock(
-                return_value=mock_response
-            )
+        fake_genai.Client.assert_called_once_with(api_key="test-key")
 
-            response = client.post(
-                "/api/ai/generate",
-                json={
-                    "model": "gemini-3-flash-preview",
-                    "contents": [{"parts": [{"text": "What is the answer?"}]}],
-                    "includeThoughts": True,
-                    "thinkingBudget": 4096,
-                },
-            )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert data["text"] == "The answer is 42."
-            assert data["thinking"] == "Let me think about this..."
-
-    @pytest.mark.asyncio
-    async def test_generation_with_function_call(self, client, monkeypatch):
-        """Should return function call when present."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
-        # Create mock response with function call
-        mock_fc = MagicMock()
-        mock_fc.name = "get_weather"
-        mock_fc.args = {"location": "San Francisco"}
-
-        mock_part = MagicMock()
-        mock_part.thought = False
-        mock_part.text = None
-        mock_part.function_call = mock_fc
-
-        mock_content = MagicMock()
-        mock_content.parts = [mock_part]
-
-        mock_candidate = MagicMock()
-        mock_candidate.content = mock_content
-
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
-
-        with (
-            patch("google.genai.Client") as mock_client_class,
-            patch("google.genai.types") as mock_types,
-        ):
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            mock_client.aio.models.generate_content = AsyncMock(
-                return_value=mock_response
-            )
-
-            response = client.post(
-                "/api/ai/generate",
-                json={
-                    "model": "gemini-3-flash-preview",
-                    "contents": [{"parts": [{"text": "What's the weather?"}]}],
-                    "tools": [
-                        {
-                            "function_declarations": [
-                                {
-                                    "name": "get_weather",
-                                    "description": "Get weather for a location",
-                                }
-                            ]
-                        }
-                    ],
-                },
-            )
-
-            assert response.status_code == 200
-            data = response.json()
-            assert data["functionCall"] is not None
-            assert data["functionCall"]["name"] == "get_weather"
-            assert data["functionCall"]["args"]["location"] == "San Francisco"
-
-    @pytest.mark.asyncio
-    async def test_api_error_handling(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_api_error_handling(self, async_client, patched_genai):
         """Should return 500 on API errors."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        patched_genai.aio.models.generate_content = async_raises(Exception("API rate limit exceeded"))
 
-        with (
-            patch("google.genai.Client") as mock_client_class,
-            patch("google.genai.types") as mock_types,
-        ):
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            mock_client.aio.models.generate_content = AsyncMock(
-                side_effect=Exception("API rate limit exceeded")
-            )
-
-            response = client.post(
-                "/api/ai/generate",
-                json={
-                    "model": "gemini-3-flash-preview",
-                    "contents": [{"parts": [{"text": "Hello"}]}],
-                },
-            )
+        response = await async_client.post(
+            "/api/ai/generate",
+            json={
+                "model": "gemini-3-flash-preview",
+                "contents": [{"parts": [{"text": "Hello"}]}],
+            },
+        )
 
-            assert response.status_code == 500
-            assert "API rate limit exceeded" in response.json()["detail"]
+        assert response.status_code == 500
+        assert "API rate limit exceeded" in response.json()["detail"]
 
 
 class TestRequestSchema:
@@ -281,3 +195,17 @@ class TestRequestSchema:
         assert req.thinkingBudget == 8192
         assert req.includeThoughts is False
         assert req.logLabel == "test-call"
+
+    @pytest.mark.parametrize(
+        "body",
+        [
+            {"contents": [{"parts": [{"text": "Hello"}]}]},
+            {"model": "gemini-3-flash-preview"},
+            {"model": "gemini-3-flash-preview", "contents": []},
+        ],
+        ids=["missing_model", "missing_contents", "empty_contents"],
+    )
+    def test_rejects_invalid_body(self, body):
+        """Should reject a missing model or missing/empty contents."""
+        with pytest.raises(ValidationError):
+            GenerateTextRequest.model_validate(body)
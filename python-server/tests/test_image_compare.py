@@ -331,6 +331,21 @@ class TestEditDetectionOptions:
         # Low threshold should detect more changed pixels
         assert low_threshold_result.total_changed_pixels >= high_threshold_result.total_changed_pixels
 
+    def test_negative_threshold_marks_identical_pixels_changed(self):
+        """A negative threshold should treat even identical pixels as changed."""
+        # Large enough to span several processing bands, most of them identical
+        original = np.full((512, 512, 3), 128, dtype=np.uint8)
+        edited = original.copy()
+        edited[20:30, 20:30] = 255
+
+        result = detect_edit_regions(
+            original,
+            edited,
+            EditDetectionOptions(color_threshold=-1.0),
+        )
+
+        assert result.total_changed_pixels == 512 * 512
+
     def test_default_options(self):
         """Should work with default options."""
         original = np.full((100, 100, 3), 128, dtype=np.uint8)
@@ -7,8 +7,10 @@ from services.image_compare_lpips import (
     EditRegionPolygon,
     LPIPSDetectionOptions,
     LPIPSDetectionResult,
+    compute_lpips_heatmap,
     detect_edit_regions_lpips,
     format_edit_regions_for_prompt,
+    postprocess_lpips_heatmap,
 )
 
 # =============================================================================
@@ -126,11 +128,14 @@ class TestLPIPSDetectionOptions:
         edited = original.copy()
         edited[100:150, 100:150] = (135, 135, 135)  # Slightly brighter
 
+        # Only the post-processing depends on the threshold
+        heatmap = compute_lpips_heatmap(original, edited)
+
         # Low threshold should detect
-        result_low = detect_edit_regions_lpips(original, edited, LPIPSDetectionOptions(threshold=0.01))
+        result_low = postprocess_lpips_heatmap(heatmap, LPIPSDetectionOptions(threshold=0.01))
 
         # High threshold should not detect (or detect less)
-        result_high = detect_edit_regions_lpips(original, edited, LPIPSDetectionOptions(threshold=0.5))
+        result_high = postprocess_lpips_heatmap(heatmap, LPIPSDetectionOptions(threshold=0.5))
 
         assert len(result_low.regions) >= len(result_high.regions)
 
@@ -140,16 +145,32 @@ class TestLPIPSDetectionOptions:
         edited = original.copy()
         edited[100:110, 100:110] = (255, 0, 0)  # Small 10x10 red square
 
+        # Only the post-processing depends on min_area
+        heatmap = compute_lpips_heatmap(original, edited)
+
         # Small min_area should detect
-        result_small = detect_edit_regions_lpips(original, edited, LPIPSDetectionOptions(min_area=10, threshold=0.05))
+        result_small = postprocess_lpips_heatmap(heatmap, LPIPSDetectionOptions(min_area=10, threshold=0.05))
 
         # Large min_area should not detect
-        result_large = detect_edit_regions_lpips(
-            original, edited, LPIPSDetectionOptions(min_area=10000, threshold=0.05)
-        )
+        result_large = postprocess_lpips_heatmap(heatmap, LPIPSDetectionOptions(min_area=10000, threshold=0.05))
 
         assert len(result_small.regions) >= len(result_large.regions)
 
+    def test_postprocess_heatmap_applies_threshold(self):
+        """postprocess_lpips_heatmap should find regions only above the threshold."""
+        heatmap = np.zeros((256, 256), dtype=np.float32)
+        heatmap[100:150, 100:150] = 0.5
+
+        result = postprocess_lpips_heatmap(heatmap, LPIPSDetectionOptions(threshold=0.1))
+        assert len(result.regions) == 1
+        x, y, w, h = result.regions[0].bounding_box
+        assert (x, y, w, h) == (100, 100, 50, 50)
+        assert result.image_width == 256
+        assert result.image_height == 256
+
+        result_high = postprocess_lpips_heatmap(heatmap, LPIPSDetectionOptions(threshold=0.6))
+        assert result_high.regions == []
+
 
 # =============================================================================
 # Dimension Handling Tests
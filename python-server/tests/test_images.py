@@ -1,32 +1,30 @@
 """Tests for POST /api/images/generate and /api/images/inpaint endpoints."""
 
+import orjson
 import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import AsyncMock, patch, MagicMock
+from types import SimpleNamespace
 
-import sys
-from pathlib import Path
-
-sys.path.insert(0, str(Path(__file__).parent.parent))
-
-from main import app
 from schemas import GenerateImageRequest, GenerateImageResponse
 from schemas import InpaintRequest, InpaintResponse
+from tests.helpers import async_raises, partial_coro
+from tests.genai_responses import make_image_response
+from tests.payloads import VALID_BASE64_DATA, VALID_BASE64_IMAGE, VALID_IMAGE_BYTES
+from tests.sse_events import async_sse_summary
 
 
-# Test fixtures
-VALID_BASE64_IMAGE = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
-
-
-@pytest.fixture
-def client():
-    """Create a test client."""
-    return TestClient(app)
+def _json(response) -> dict:
+    """Decode a response body with orjson rather than response.json()."""
+    return orjson.loads(response.content)
 
 
 class TestGenerateImageEndpoint:
     """Tests for POST /api/images/generate."""
 
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        """Configure a fake Gemini API key for every test in this class."""
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+
     def test_missing_api_key(self, client, monkeypatch):
         """Should return 500 if API key is not configured."""
         monkeypatch.delenv("GEMINI_API_KEY", raising=False)
@@ -42,40 +40,13 @@ class TestGenerateImageEndpoint:
         )
 
         assert response.status_code == 500
-        assert "GEMINI_API_KEY" in response.json()["detail"]
+        assert "GEMINI_API_KEY" in response.text
 
     def test_validation_missing_model(self, client):
         """Should return 422 if model is missing."""
         response = client.post(
             "/api/images/generate",
-            json={
-                "sourceImage": VALID_BASE64_IMAGE,
-                "prompt": "Make the sky blue",
-            },
-        )
-
-        assert response.status_code == 422
-
-    def test_validation_missing_source_image(self, client):
-        """Should return 422 if sourceImage is missing."""
-        response = client.post(
-            "/api/images/generate",
-            json={
-                "model": "gemini-3-pro-image-preview",
-                "prompt": "Make the sky blue",
-            },
-        )
-
-        assert response.status_code == 422
-
-    def test_validation_missing_prompt(self, client):
-        """Should return 422 if prompt is missing."""
-        response = client.post(
-            "/api/images/generate",
-            json={
-                "model": "gemini-3-pro-image-preview",
-                "sourceImage": VALID_BASE64_IMAGE,
-            },
+            json={"sourceImage": VALID_BASE64_IMAGE, "prompt": "Make the sky blue"},
         )
 
         assert response.status_code == 422
@@ -106,158 +77,83 @@ class TestGenerateImageEndpoint:
 
         assert response.status_code == 422
 
-    @pytest.mark.asyncio
-    async def test_successful_image_generation(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_successful_image_generation(self, async_client, patched_genai):
         """Should return generated image on success."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
-        # Create mock response with inline_data
-        mock_inline_data = MagicMock()
-        mock_inline_data.mime_type = "image/png"
-        mock_inline_data.data = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNk+M9QDwADhgGAWjR9awAAAABJRU5ErkJggg=="
-
-        mock_part = MagicMock()
-        mock_part.inline_data = mock_inline_data
+        mock_response = make_image_response(VALID_BASE64_DATA)
 
-        mock_content = MagicMock()
-        mock_content.parts = [mock_part]
+        patched_genai.aio.models.generate_content = partial_coro(mock_response)
 
-        mock_candidate = MagicMock()
-        mock_candidate.content = mock_content
-
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
-
-        # Patch the genai client
-        with (
-            patch("google.genai.Client") as mock_client_class,
-            patch("google.genai.types") as mock_types,
-        ):
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-
-            # Mock GenerateContentConfig
-            mock_types.GenerateContentConfig.return_value = MagicMock()
-
-            # Make generate_content async
-            mock_client.aio.models.generate_content = AsyncMock(
-                return_value=mock_response
-            )
-
-            response = client.post(
-                "/api/images/generate",
-                json={
-                    "model": "gemini-3-pro-image-preview",
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "prompt": "Make the sky blue",
-                },
-            )
+        response = await async_client.post(
+            "/api/images/generate",
+            json={
+                "model": "gemini-3-pro-image-preview",
+                "sourceImage": VALID_BASE64_IMAGE,
+                "prompt": "Make the sky blue",
+            },
+        )
 
-            assert response.status_code == 200
-            data = response.json()
-            assert "imageData" in data
-            assert data["imageData"].startswith("data:image/png;base64,")
-            assert "raw" in data
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        data = _json(response)
+        assert "imageData" in data
+        assert data["imageData"].startswith("data:image/png;base64,")
+        assert "raw" in data
 
-    @pytest.mark.asyncio
-    async def test_no_image_returned(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_no_image_returned(self, async_client, patched_genai):
         """Should return 500 if no image is returned from API."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
-        # Create mock response with no image data
-        mock_part = MagicMock()
-        mock_part.inline_data = None  # No image data
+        mock_response = make_image_response(None)  # No image data
 
-        mock_content = MagicMock()
-        mock_content.parts = [mock_part]
+        patched_genai.aio.models.generate_content = partial_coro(mock_response)
 
-        mock_candidate = MagicMock()
-        mock_candidate.content = mock_content
-
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
-
-        with (
-            patch("google.genai.Client") as mock_client_class,
-            patch("google.genai.types") as mock_types,
-        ):
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            mock_types.GenerateContentConfig.return_value = MagicMock()
-            mock_client.aio.models.generate_content = AsyncMock(
-                return_value=mock_response
-            )
-
-            response = client.post(
-                "/api/images/generate",
-                json={
-                    "model": "gemini-3-pro-image-preview",
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "prompt": "Make the sky blue",
-                },
-            )
+        response = await async_client.post(
+            "/api/images/generate",
+            json={
+                "model": "gemini-3-pro-image-preview",
+                "sourceImage": VALID_BASE64_IMAGE,
+                "prompt": "Make the sky blue",
+            },
+        )
 
-            assert response.status_code == 500
-            assert "No image data returned" in response.json()["detail"]
+        assert response.status_code == 500
+        assert "No image data returned" in _json(response)["detail"]
 
-    @pytest.mark.asyncio
-    async def test_api_error_handling(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_api_error_handling(self, async_client, patched_genai):
         """Should return 500 on API errors."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
-        with (
-            patch("google.genai.Client") as mock_client_class,
-            patch("google.genai.types") as mock_types,
-        ):
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            mock_types.GenerateContentConfig.return_value = MagicMock()
-            mock_client.aio.models.generate_content = AsyncMock(
-                side_effect=Exception("API rate limit exceeded")
-            )
+        patched_genai.aio.models.generate_content = async_raises(Exception("API rate limit exceeded"))
 
-            response = client.post(
-                "/api/images/generate",
-                json={
-                    "model": "gemini-3-pro-image-preview",
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "prompt": "Make the sky blue",
-                },
-            )
+        response = await async_client.post(
+            "/api/images/generate",
+            json={
+                "model": "gemini-3-pro-image-preview",
+                "sourceImage": VALID_BASE64_IMAGE,
+                "prompt": "Make the sky blue",
+            },
+        )
 
-            assert response.status_code == 500
-            assert "API rate limit exceeded" in response.json()["detail"]
+        assert response.status_code == 500
+        assert "API rate limit exceeded" in _json(response)["detail"]
 
-    @pytest.mark.asyncio
-    async def test_empty_candidates(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_empty_candidates(self, async_client, patched_genai):
         """Should return 500 if candidates is empty."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+        mock_response = SimpleNamespace(candidates=[])
 
-        mock_response = MagicMock()
-        mock_response.candidates = []
-
-        with (
-            patch("google.genai.Client") as mock_client_class,
-            patch("google.genai.types") as mock_types,
-        ):
-            mock_client = MagicMock()
-            mock_client_class.return_value = mock_client
-            mock_types.GenerateContentConfig.return_value = MagicMock()
-            mock_client.aio.models.generate_content = AsyncMock(
-                return_value=mock_response
-            )
+        patched_genai.aio.models.generate_content = partial_coro(mock_response)
 
-            response = client.post(
-                "/api/images/generate",
-                json={
-                    "model": "gemini-3-pro-image-preview",
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "prompt": "Make the sky blue",
-                },
-            )
+        response = await async_client.post(
+            "/api/images/generate",
+            json={
+                "model": "gemini-3-pro-image-preview",
+                "sourceImage": VALID_BASE64_IMAGE,
+                "prompt": "Make the sky blue",
+            },
+        )
 
-            assert response.status_code == 500
-            assert "No image data returned" in response.json()["detail"]
+        assert response.status_code == 500
+        assert "No image data returned" in _json(response)["detail"]
 
 
 class TestRequestSchema:
@@ -310,6 +206,28 @@ class TestRequestSchema:
                 maskImage="not-a-data-url",
             )
 
+    def test_non_base64_data_url(self):
+        """Should reject a data URL whose payload is not base64."""
+        with pytest.raises(ValueError, match="base64"):
+            GenerateImageRequest(
+                model="gemini-3-pro-image-preview",
+                sourceImage="data:image/svg+xml,<svg/>",
+                prompt="Make the sky blue",
+            )
+
+    @pytest.mark.parametrize("missing", ["model", "sourceImage", "prompt"])
+    def test_missing_required_field(self, missing):
+        """Should reject a request missing a required field."""
+        body = {
+            "model": "gemini-3-pro-image-preview",
+            "sourceImage": VALID_BASE64_IMAGE,
+            "prompt": "Make the sky blue",
+        }
+        del body[missing]
+
+        with pytest.raises(ValueError):
+            GenerateImageRequest.model_validate(body)
+
 
 class TestResponseSchema:
     """Tests for GenerateImageResponse schema."""
@@ -371,31 +289,25 @@ class TestHelperFunctions:
         """Should extract image from valid response."""
         from main import extract_image_from_response
 
-        mock_inline_data = MagicMock()
-        mock_inline_data.mime_type = "image/png"
-        mock_inline_data.data = "ABC123=="
-
-        mock_part = MagicMock()
-        mock_part.inline_data = mock_inline_data
+        mock_response = make_image_response("ABC123==")
 
-        mock_content = MagicMock()
-        mock_content.parts = [mock_part]
+        result = extract_image_from_response(mock_response)
+        assert result == "data:image/png;base64,ABC123=="
 
-        mock_candidate = MagicMock()
-        mock_candidate.content = mock_content
+    def test_extract_image_from_response_raw_bytes(self):
+        """Should base64-encode raw inline_data bytes into a data URL."""
+        from main import extract_image_from_response
 
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
+        mock_response = make_image_response(VALID_IMAGE_BYTES)
 
         result = extract_image_from_response(mock_response)
-        assert result == "data:image/png;base64,ABC123=="
+        assert result == VALID_BASE64_IMAGE
 
     def test_extract_image_from_response_no_candidates(self):
         """Should return None if no candidates."""
         from main import extract_image_from_response
 
-        mock_response = MagicMock()
-        mock_response.candidates = []
+        mock_response = SimpleNamespace(candidates=[])
 
         result = extract_image_from_response(mock_response)
         assert result is None
@@ -404,11 +316,7 @@ class TestHelperFunctions:
         """Should return None if no content."""
         from main import extract_image_from_response
 
-        mock_candidate = MagicMock()
-        mock_candidate.content = None
-
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
+        mock_response = SimpleNamespace(candidates=[SimpleNamespace(content=None)])
 
         result = extract_image_from_response(mock_response)
         assert result is None
@@ -417,14 +325,9 @@ class TestHelperFunctions:
         """Should return None if no parts."""
         from main import extract_image_from_response
 
-        mock_content = MagicMock()
-        mock_content.parts = None
-
-        mock_candidate = MagicMock()
-        mock_candidate.content = mock_content
-
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
+        mock_response = SimpleNamespace(
+            candidates=[SimpleNamespace(content=SimpleNamespace(parts=None))]
+        )
 
         result = extract_image_from_response(mock_response)
         assert result is None
@@ -433,17 +336,7 @@ class TestHelperFunctions:
         """Should return None if no inline_data."""
         from main import extract_image_from_response
 
-        mock_part = MagicMock()
-        mock_part.inline_data = None
-
-        mock_content = MagicMock()
-        mock_content.parts = [mock_part]
-
-        mock_candidate = MagicMock()
-        mock_candidate.content = mock_content
-
-        mock_response = MagicMock()
-        mock_response.candidates = [mock_candidate]
+        mock_response = make_image_response(None)
 
         result = extract_image_from_response(mock_response)
         assert result is None
@@ -454,74 +347,19 @@ class TestHelperFunctions:
 # =============================================================================
 
 
-def parse_sse_events(response_text: str) -> list[dict]:
-    """
-    Parse SSE response text into a list of events.
-
-    Each SSE event has format:
-    event: <type>
-    data: <json>
-
-    (blank line separates events)
-    """
-    import json
-
-    events = []
-    current_event = {}
-
-    for line in response_text.split("\n"):
-        line = line.strip()
-        if line.startswith("event:"):
-            current_event["type"] = line[6:].strip()
-        elif line.startswith("data:"):
-            current_event["data"] = json.loads(line[5:].strip())
-        elif line == "" and current_event:
-            if "type" in current_event and "data" in current_event:
-                events.append(current_event)
-            current_event = {}
-
-    # Handle last event if no trailing newline
-    if "type" in current_event and "data" in current_event:
-        events.append(current_event)
-
-    return events
-
-
 class TestInpaintEndpoint:
     """Tests for POST /api/images/inpaint (now uses SSE streaming)."""
 
-    def test_validation_missing_source_image(self, client):
-        """Should return 422 if sourceImage is missing."""
-        response = client.post(
-            "/api/images/inpaint",
-            json={
-                "maskImage": VALID_BASE64_IMAGE,
-                "prompt": "Remove this object",
-            },
-        )
-
-        assert response.status_code == 422
+    @pytest.fixture(autouse=True)
+    def _api_key(self, monkeypatch):
+        """Configure a fake Gemini API key for every test in this class."""
+        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
 
     def test_validation_missing_mask_image(self, client):
         """Should return 422 if maskImage is missing."""
         response = client.post(
             "/api/images/inpaint",
-            json={
-                "sourceImage": VALID_BASE64_IMAGE,
-                "prompt": "Remove this object",
-            },
-        )
-
-        assert response.status_code == 422
-
-    def test_validation_missing_prompt(self, client):
-        """Should return 422 if prompt is missing."""
-        response = client.post(
-            "/api/images/inpaint",
-            json={
-                "sourceImage": VALID_BASE64_IMAGE,
-                "maskImage": VALID_BASE64_IMAGE,
-            },
+            json={"sourceImage": VALID_BASE64_IMAGE, "prompt": "Remove this object"},
         )
 
         assert response.status_code == 422
@@ -565,11 +403,9 @@ class TestInpaintEndpoint:
 
         assert response.status_code == 422
 
-    @pytest.mark.asyncio
-    async def test_successful_inpaint_sse(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_successful_inpaint_sse(self, async_client, fake_graph):
         """Should return SSE stream with progress and complete events."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
         # Mock final state from the graph
         mock_final_state = {
             "current_result": VALID_BASE64_IMAGE,
@@ -577,31 +413,28 @@ class TestInpaintEndpoint:
             "current_iteration": 2,
         }
 
-        # Create async generator that yields mock data
-        async def mock_astream(*args, **kwargs):
-            # Yield a progress event
-            yield (
-                "custom",
-                {
-                    "step": "planning",
-                    "message": "Planning the edit...",
-                },
-            )
-            # Yield the final state
-            yield ("values", mock_final_state)
-
-        with patch("main.agentic_edit_graph") as mock_graph:
-            mock_graph.astream = mock_astream
-
-            response = client.post(
-                "/api/images/inpaint",
-                json={
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "maskImage": VALID_BASE64_IMAGE,
-                    "prompt": "Make it blue",
-                },
-            )
+        fake_graph(
+            [
+                (
+                    "custom",
+                    {
+                        "step": "planning",
+                        "message": "Planning the edit...",
+                    },
+                ),
+                ("values", mock_final_state),
+            ]
+        )
 
+        async with async_client.stream(
+            "POST",
+            "/api/images/inpaint",
+            json={
+                "sourceImage": VALID_BASE64_IMAGE,
+                "maskImage": VALID_BASE64_IMAGE,
+                "prompt": "Make it blue",
+            },
+        ) as response:
             # SSE always returns 200, errors are in the stream
             assert response.status_code == 200
             assert (
@@ -609,57 +442,47 @@ class TestInpaintEndpoint:
             )
 
             # Parse SSE events
-            events = parse_sse_events(response.text)
-
-            # Should have progress events and a complete event
-            event_types = [e["type"] for e in events]
-            assert "progress" in event_types
-            assert "complete" in event_types
-
-            # Find the complete event
-            complete_event = next(e for e in events if e["type"] == "complete")
-            assert "imageData" in complete_event["data"]
-            assert complete_event["data"]["imageData"].startswith("data:image/")
-            assert "iterations" in complete_event["data"]
-            assert complete_event["data"]["iterations"] == 2
-
-    @pytest.mark.asyncio
-    async def test_inpaint_error_yields_sse_error(self, client, monkeypatch):
-        """Should return SSE error event when graph throws an error."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
+            stream = await async_sse_summary(response)
 
-        async def mock_astream_error(*args, **kwargs):
-            raise Exception("API rate limit exceeded")
-            yield  # Make this a generator
+        # Should have progress events and a complete event
+        assert "progress" in stream.types
+        assert "complete" in stream.types
 
-        with patch("main.agentic_edit_graph") as mock_graph:
-            mock_graph.astream = mock_astream_error
+        # Find the complete event
+        complete = stream.find("complete")
+        assert "imageData" in complete
+        assert complete["imageData"].startswith("data:image/")
+        assert "iterations" in complete
+        assert complete["iterations"] == 2
 
-            response = client.post(
-                "/api/images/inpaint",
-                json={
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "maskImage": VALID_BASE64_IMAGE,
-                    "prompt": "Edit this",
-                },
-            )
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_inpaint_error_yields_sse_error(self, async_client, fake_graph):
+        """Should return SSE error event when graph throws an error."""
+        fake_graph([Exception("API rate limit exceeded")])
 
+        async with async_client.stream(
+            "POST",
+            "/api/images/inpaint",
+            json={
+                "sourceImage": VALID_BASE64_IMAGE,
+                "maskImage": VALID_BASE64_IMAGE,
+                "prompt": "Edit this",
+            },
+        ) as response:
             # SSE always returns 200, errors are in the stream
             assert response.status_code == 200
 
             # Parse SSE events
-            events = parse_sse_events(response.text)
+            stream = await async_sse_summary(response)
 
-            # Should have an error event
-            error_event = next((e for e in events if e["type"] == "error"), None)
-            assert error_event is not None
-            assert "API rate limit exceeded" in error_event["data"]["message"]
+        # Should have an error event
+        error = stream.find("error")
+        assert error is not None
+        assert "API rate limit exceeded" in error["message"]
 
-    @pytest.mark.asyncio
-    async def test_inpaint_no_image_yields_sse_error(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_inpaint_no_image_yields_sse_error(self, async_client, fake_graph):
         """Should return SSE error event when no image is generated."""
-        monkeypatch.setenv("GEMINI_API_KEY", "test-key")
-
         # Mock final state with no image
         mock_final_state = {
             "current_result": None,
@@ -667,34 +490,30 @@ class TestInpaintEndpoint:
             "current_iteration": 1,
         }
 
-        async def mock_astream(*args, **kwargs):
-            yield ("values", mock_final_state)
-
-        with patch("main.agentic_edit_graph") as mock_graph:
-            mock_graph.astream = mock_astream
-
-            response = client.post(
-                "/api/images/inpaint",
-                json={
-                    "sourceImage": VALID_BASE64_IMAGE,
-                    "maskImage": VALID_BASE64_IMAGE,
-                    "prompt": "Edit this",
-                },
-            )
+        fake_graph([("values", mock_final_state)])
 
+        async with async_client.stream(
+            "POST",
+            "/api/images/inpaint",
+            json={
+                "sourceImage": VALID_BASE64_IMAGE,
+                "maskImage": VALID_BASE64_IMAGE,
+                "prompt": "Edit this",
+            },
+        ) as response:
             # SSE always returns 200, errors are in the stream
             assert response.status_code == 200
 
             # Parse SSE events
-            events = parse_sse_events(response.text)
+            stream = await async_sse_summary(response)
 
-            # Should have an error event about no image
-            error_event = next((e for e in events if e["type"] == "error"), None)
-            assert error_event is not None
-            assert "No image generated" in error_event["data"]["message"]
+        # Should have an error event about no image
+        error = stream.find("error")
+        assert error is not None
+        assert "No image generated" in error["message"]
 
-    @pytest.mark.asyncio
-    async def test_inpaint_missing_api_key_returns_500(self, client, monkeypatch):
+    @pytest.mark.asyncio(loop_scope="session")
+    async def test_inpaint_missing_api_key_returns_500(self, async_client, monkeypatch):
         """Should return 500 error when API key is not configured.
 
         API key validation now happens via FastAPI dependency injection,
@@ -704,7 +523,7 @@ class TestInpaintEndpoint:
         monkeypatch.delenv("GEMINI_API_KEY", raising=False)
         monkeypatch.delenv("GOOGLE_API_KEY", raising=False)
 
-        response = client.post(
+        response = await async_client.post(
             "/api/images/inpaint",
             json={
                 "sourceImage": VALID_BASE64_IMAGE,
@@ -715,8 +534,7 @@ class TestInpaintEndpoint:
 
         # API key validation fails before SSE starts, returning 500
         assert response.status_code == 500
-        data = response.json()
-        assert "GEMINI_API_KEY" in data["detail"]
+        assert "GEMINI_API_KEY" in response.text
 
 
 class TestInpaintRequestSchema:
@@ -762,6 +580,19 @@ class TestInpaintRequestSchema:
                 prompt="Remove this object",
             )
 
+    @pytest.mark.parametrize("missing", ["sourceImage", "maskImage", "prompt"])
+    def test_missing_required_field(self, missing):
+        """Should reject a request missing a required field."""
+        body = {
+            "sourceImage": VALID_BASE64_IMAGE,
+            "maskImage": VALID_BASE64_IMAGE,
+            "prompt": "Remove this object",
+        }
+        del body[missing]
+
+        with pytest.raises(ValueError):
+            InpaintRequest.model_validate(body)
+
 
 # Note: TestInpaintResponseSchema removed - endpoint now returns SSE, not JSON
 # The InpaintResponse schema is no longer used for the endpoint response.
@@ -11,22 +11,27 @@ Tests cover:
 
 import pytest
 from schemas.agentic import BoundingBox, Point2D, ShapeMetadata
-from services.shape_descriptions import _color_name, build_shapes_context, describe_shape
+from services.shape_descriptions import (
+    _color_name,
+    _normalize_color,
+    build_shapes_context,
+    describe_shape,
+)
 
 # =============================================================================
 # Fixtures
 # =============================================================================
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def basic_bbox() -> BoundingBox:
-    """Basic bounding box for testing."""
+    """Basic bounding box for testing (frozen, so shared across the session)."""
     return BoundingBox(x=100, y=200, width=150, height=100)
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def square_bbox() -> BoundingBox:
-    """Square bounding box for circle tests."""
+    """Square bounding box for circle tests (frozen, so shared across the session)."""
     return BoundingBox(x=200, y=200, width=100, height=100)
 
 
@@ -36,34 +41,47 @@ def square_bbox() -> BoundingBox:
 
 
 class TestColorName:
-    """Tests for the _color_name helper function."""
-
-    def test_common_colors(self):
-        """Test that common colors get proper names."""
-        assert _color_name("#ff0000") == "red"
-        assert _color_name("#00ff00") == "green"
-        assert _color_name("#0000ff") == "blue"
-        assert _color_name("#000000") == "black"
-        assert _color_name("#ffffff") == "white"
-
-    def test_excalidraw_colors(self):
-        """Test Excalidraw's default palette colors."""
-        assert _color_name("#e03131") == "red"
-        assert _color_name("#2f9e44") == "green"
-        assert _color_name("#1971c2") == "blue"
-
-    def test_unknown_color_returns_hex(self):
-        """Test that unknown colors return the hex value."""
-        assert _color_name("#abcdef") == "#abcdef"
-
-    def test_case_insensitive(self):
-        """Test that color matching is case-insensitive."""
-        assert _color_name("#FF0000") == "red"
-        assert _color_name("#Ff0000") == "red"
-
-    def test_without_hash_prefix(self):
-        """Test colors without # prefix."""
-        assert _color_name("ff0000") == "red"
+    """Tests for the _normalize_color and _color_name helpers."""
+
+    @pytest.mark.parametrize(
+        "hex_in,expected",
+        [
+            # Common colors
+            ("#ff0000", "red"),
+            ("#00ff00", "green"),
+            ("#0000ff", "blue"),
+            ("#000000", "black"),
+            ("#ffffff", "white"),
+            # Excalidraw's default palette
+            ("#e03131", "red"),
+            ("#2f9e44", "green"),
+            ("#1971c2", "blue"),
+            # Case-insensitive matching
+            ("#FF0000", "red"),
+            ("#Ff0000", "red"),
+            # Missing # prefix
+            ("ff0000", "red"),
+            # Unknown colors return the hex value
+            ("#abcdef", "#abcdef"),
+        ],
+    )
+    def test_color_name(self, hex_in: str, expected: str):
+        """Test hex to color name conversion."""
+        assert _color_name(_normalize_color(hex_in)) == expected
+
+    def test_describe_shape_normalizes_raw_colors(self, basic_bbox):
+        """Test that raw colors are named in the description but kept as given on the model."""
+        shape = ShapeMetadata(
+            type="rectangle",
+            strokeColor=" FF0000 ",
+            backgroundColor="transparent",
+            boundingBox=basic_bbox,
+        )
+        desc = describe_shape(shape)
+
+        assert shape.strokeColor == " FF0000 "
+        assert shape.backgroundColor == "transparent"
+        assert "red outline" in desc
 
 
 # =============================================================================
@@ -0,0 +1,176 @@
+"""Tests for sse.py utilities.
+
+Tests cover:
+1. format_sse_event - pydantic and plain-dict payloads
+2. coalesce_sse_events - batching, immediate flush of terminal frames, timeouts
+"""
+
+import asyncio
+
+import orjson
+import pytest
+
+from schemas.agentic import AgenticEditResponse, AIInputImage, AIProgressEvent, IterationInfo
+from utils.sse import (
+    coalesce_sse_events,
+    format_complete_event,
+    format_error_event,
+    format_progress_event,
+    format_sse_event,
+)
+
+
+async def collect(chunks) -> list[str]:
+    """Drain an async iterator into a list."""
+    return [chunk async for chunk in chunks]
+
+
+async def frames(*events: str, delay: float = 0.0):
+    """Yield the given frames, sleeping ``delay`` seconds before each one."""
+    for event in events:
+        if delay:
+            await asyncio.sleep(delay)
+        yield event
+
+
+# =============================================================================
+# Tests for format_sse_event
+# =============================================================================
+
+
+class TestFormatSseEvent:
+    """Tests for format_sse_event."""
+
+    def test_formats_dict_payload(self):
+        """Should emit an event line and a JSON data line."""
+        result = format_sse_event("progress", {"step": "planning", "bytes": b"hi"})
+
+        event_line, data_line, blank, end = result.split("\n")
+        assert event_line == "event: progress"
+        assert orjson.loads(data_line[len("data: ") :]) == {"step": "planning", "bytes": "aGk="}
+        assert (blank, end) == ("", "")
+
+    def test_pydantic_payload_excludes_none(self):
+        """Should drop None fields from pydantic payloads."""
+        result = format_progress_event(AIProgressEvent(step="planning", message="Planning..."))
+
+        data = orjson.loads(result.split("\n")[1][len("data: ") :])
+        assert data == {"step": "planning", "message": "Planning..."}
+
+    def test_fixed_type_helpers_match_generic_format(self):
+        """Should frame progress/error events exactly like format_sse_event."""
+        event = AIProgressEvent(step="planning", message="Planning...")
+
+        assert format_progress_event(event) == format_sse_event("progress", event)
+        assert format_error_event("boom", "trace") == format_sse_event(
+            "error", {"message": "boom", "details": "trace"}
+        )
+
+
+    def test_event_payloads_match_model_dump(self):
+        """Should match model_dump(mode="json", exclude_none=True), including nested models."""
+        event = AIProgressEvent(
+            step="processing",
+            message="Iterating",
+            inputImages=[AIInputImage(label="source", dataUrl="data:image/png;base64,AAAA")],
+            iteration=IterationInfo(current=1, max=3),
+        )
+        response = AgenticEditResponse(
+            imageData="data:image/png;base64,AAAA", iterations=2, finalPrompt="make it red"
+        )
+
+        progress_data = orjson.loads(format_progress_event(event).split("\n")[1][len("data: ") :])
+        complete_data = orjson.loads(format_complete_event(response).split("\n")[1][len("data: ") :])
+
+        assert progress_data == event.model_dump(mode="json", exclude_none=True)
+        assert complete_data == response.model_dump(mode="json", exclude_none=True)
+
+
+# =============================================================================
+# Tests for coalesce_sse_events
+# =============================================================================
+
+
+class TestCoalesceSseEvents:
+    """Tests for coalesce_sse_events."""
+
+    @pytest.mark.asyncio
+    async def test_batches_burst_of_frames(self):
+        """Should join frames that arrive together into one chunk."""
+        events = [format_sse_event("progress", {"i": i}) for i in range(3)]
+
+        chunks = await collect(coalesce_sse_events(frames(*events)))
+
+        assert chunks == ["".join(events)]
+
+    @pytest.mark.asyncio
+    async def test_caps_batch_size(self):
+        """Should flush once max_events frames are buffered."""
+        events = [format_sse_event("progress", {"i": i}) for i in range(5)]
+
+        chunks = await collect(coalesce_sse_events(frames(*events), max_events=2))
+
+        assert chunks == ["".join(events[0:2]), "".join(events[2:4]), events[4]]
+
+    @pytest.mark.asyncio
+    async def test_flushes_terminal_frames_immediately(self):
+        """Should not hold a complete or error frame in the buffer."""
+        progress = format_sse_event("progress", {"i": 0})
+        error = format_error_event("boom")
+        trailing = format_sse_event("progress", {"i": 1})
+
+        chunks = await collect(coalesce_sse_events(frames(progress, error, trailing)))
+
+        assert chunks == [progress + error, trailing]
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_max_delay(self):
+        """Should not hold buffered frames while the next one is slow."""
+        events = [format_sse_event("progress", {"i": i}) for i in range(2)]
+
+        chunks = await collect(
+            coalesce_sse_events(frames(*events, delay=0.05), max_delay=0.005)
+        )
+
+        assert chunks == events
+
+    @pytest.mark.asyncio
+    async def test_empty_stream(self):
+        """Should yield nothing for an empty stream."""
+        assert await collect(coalesce_sse_events(frames())) == []
+
+    @pytest.mark.asyncio
+    async def test_flushes_buffer_before_upstream_error(self):
+        """Should yield already-buffered frames before re-raising an upstream error."""
+        events = [format_sse_event("progress", {"i": i}) for i in range(2)]
+
+        async def failing():
+            for event in events:
+                yield event
+            raise RuntimeError("upstream failed")
+
+        chunks = []
+        with pytest.raises(RuntimeError, match="upstream failed"):
+            async for chunk in coalesce_sse_events(failing()):
+                chunks.append(chunk)
+
+        assert chunks == ["".join(events)]
+
+    @pytest.mark.asyncio
+    async def test_closes_upstream_when_consumer_stops(self):
+        """Should finalize the upstream generator when closed mid-stream."""
+        closed = asyncio.Event()
+
+        async def endless():
+            try:
+                yield format_error_event("boom")
+                await asyncio.sleep(3600)
+                yield format_error_event("never")
+            finally:
+                closed.set()
+
+        stream = coalesce_sse_events(endless())
+        await anext(stream)
+        await stream.aclose()
+
+        assert closed.is_set()
@@ -1,6 +1,7 @@
 """Utility functions for the Python AI server."""
 
 from .sse import (
+    coalesce_sse_events,
     format_sse_event,
     format_progress_event,
     format_complete_event,
@@ -18,7 +19,10 @@ from .ai_logging import (
     ImageLogData,
 )
 
+from .orjson_response import ORJSONResponse, orjson_default
+
 __all__ = [
+    "coalesce_sse_events",
     "format_sse_event",
     "format_progress_event",
     "format_complete_event",
@@ -31,4 +35,6 @@ __all__ = [
     "extract_images_from_contents",
     "ImageMetadata",
     "ImageLogData",
+    "ORJSONResponse",
+    "orjson_default",
 ]
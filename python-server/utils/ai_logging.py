@@ -4,11 +4,13 @@ Provides functions to create thumbnails and extract metadata from images
 for logging purposes when AI endpoints receive image inputs.
 """
 
-import base64
+import functools
 import io
 import logging
+import struct
 from typing import TypedDict
 
+import pybase64
 from PIL import Image
 
 logger = logging.getLogger(__name__)
@@ -33,61 +35,164 @@ class ImageLogData(TypedDict):
     mimeType: str
 
 
+def _data_url_header(data_url: str) -> str:
+    """Return the data URL header up to and including the first comma.
+
+    Base64 payloads never contain a comma, so the search stops at the end of
+    the header however long its media-type parameters are. Raw base64 has
+    no comma and yields an empty header.
+    """
+    return data_url[: data_url.find(",") + 1]
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_data_url_header(header: str) -> tuple[str, int]:
+    """Return (mime_type, index where the base64 payload starts).
+
+    Takes only the header from _data_url_header, so the cache key stays small
+    no matter how large the image is. An empty header (raw base64) defaults
+    to image/png with the payload at 0.
+    """
+    if not header:
+        return "image/png", 0
+    semicolon = header.find(";")
+    if semicolon == -1:
+        return "image/png", len(header)
+    return header[:semicolon].replace("data:", ""), len(header)
+
+
+def split_data_url(data_url: str) -> tuple[str, str]:
+    """
+    Split a data URL into its MIME type and base64 data in a single pass.
+
+    Use this instead of calling extract_mime_type and extract_base64_data
+    back to back on the same (potentially multi-megabyte) string.
+
+    Returns:
+        Tuple of (mime_type, base64_data).
+    """
+    mime_type, start = _parse_data_url_header(_data_url_header(data_url))
+    return mime_type, data_url[start:]
+
+
 def extract_base64_data(data_url: str) -> str:
     """Extract the base64 data (without data URL prefix) from a data URL."""
-    if "," not in data_url:
-        return data_url
-    return data_url.split(",")[1]
+    return data_url[_parse_data_url_header(_data_url_header(data_url))[1] :]
 
 
 def extract_mime_type(data_url: str) -> str:
     """Extract the MIME type from a base64 data URL."""
-    if ";" not in data_url:
-        return "image/png"
-    prefix = data_url.split(";")[0]
-    return prefix.replace("data:", "")
+    return _parse_data_url_header(_data_url_header(data_url))[0]
 
 
-def create_image_thumbnail(base64_data: str, max_size: int = 128) -> str:
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# JPEG start-of-frame markers; C4 (DHT), C8 (JPG) and CC (DAC) share the range
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+# Base64 characters decoded when peeking at an image header (a multiple of 4)
+_HEADER_PEEK_LEN = 1024
+
+
+def _jpeg_dimensions(image_bytes: bytes) -> tuple[int, int] | None:
+    """Walk JPEG marker segments up to the first SOF and read its size."""
+    i = 2
+    while i + 9 <= len(image_bytes):
+        if image_bytes[i] != 0xFF:
+            return None
+        marker = image_bytes[i + 1]
+        if marker == 0xFF:
+            # Fill byte before a marker
+            i += 1
+            continue
+        if marker in _JPEG_SOF_MARKERS:
+            height, width = struct.unpack_from(">HH", image_bytes, i + 5)
+            return width, height
+        (segment_len,) = struct.unpack_from(">H", image_bytes, i + 2)
+        i += 2 + segment_len
+    return None
+
+
+def _peek_dimensions(image_bytes: bytes) -> tuple[int, int] | None:
     """
-    Create a thumbnail from base64 image data.
+    Read (width, height) straight from a PNG or JPEG header.
 
-    Args:
-        base64_data: Base64-encoded image data (without data URL prefix).
-        max_size: Maximum dimension (width or height) of the thumbnail.
+    Returns None for other formats, or when the header is not within
+    image_bytes, so callers can fall back to PIL.
+    """
+    if image_bytes.startswith(_PNG_SIGNATURE):
+        if len(image_bytes) >= 24 and image_bytes[12:16] == b"IHDR":
+            return struct.unpack_from(">II", image_bytes, 16)
+        return None
+    if image_bytes.startswith(b"\xff\xd8"):
+        return _jpeg_dimensions(image_bytes)
+    return None
 
-    Returns:
-        Base64-encoded thumbnail as a data URL.
+
+def _normalize_base64(base64_data: str) -> str:
+    """Drop line breaks and other whitespace, so lengths and slices map to bytes."""
+    if "\n" in base64_data or "\r" in base64_data or " " in base64_data or "\t" in base64_data:
+        return "".join(base64_data.split())
+    return base64_data
+
+
+def _decode_base64(base64_data: str) -> bytes:
+    """
+    Decode base64 as leniently as base64.b64decode.
+
+    The validated pybase64 path is the fastest but rejects line breaks and
+    other whitespace (base64.encodebytes, MIME wrapping), so fall back to the
+    lenient decoder, which discards them.
     """
     try:
-        # Decode base64 to bytes
-        image_bytes = base64.b64decode(base64_data)
+        return pybase64.b64decode(base64_data, validate=True)
+    except ValueError:
+        return pybase64.b64decode(base64_data)
 
+
+def _decoded_size(base64_data: str) -> int:
+    """Number of bytes normalized base64_data decodes to, without decoding it."""
+    return max(len(base64_data) * 3 // 4 - base64_data[-2:].count("="), 0)
+
+
+def _create_image_thumbnail_bytes(image_bytes: bytes, max_size: int) -> str:
+    """Create a thumbnail data URL from already-decoded image bytes."""
+    try:
         # Open image with PIL
         with Image.open(io.BytesIO(image_bytes)) as img:
-            # Convert to RGB if necessary (handles RGBA, palette, etc.)
-            if img.mode in ("RGBA", "LA", "P"):
-                # Create white background for transparent images
-                background = Image.new("RGB", img.size, (255, 255, 255))
-                if img.mode == "P":
-                    img = img.convert("RGBA")
-                background.paste(
-                    img, mask=img.split()[-1] if img.mode in ("RGBA", "LA") else None
-                )
-                img = background
-            elif img.mode != "RGB":
+            # Let libjpeg decode at a reduced DCT scale; thumbnail() below
+            # still produces the exact target size
+            if img.format == "JPEG":
+                img.draft("RGB", (max_size * 2, max_size * 2))
+
+            # Palette images resample as RGBA; other alpha-less modes as RGB
+            if img.mode == "P":
+                img = img.convert("RGBA")
+            elif img.mode not in ("RGB", "RGBA", "LA"):
+                img = img.convert("RGB")
+
+            # Fully opaque RGBA (common for screenshots) resamples faster as
+            # RGB and needs no flattening afterwards
+            if img.mode == "RGBA" and img.getextrema()[3][0] == 255:
                 img = img.convert("RGB")
 
             # Calculate thumbnail size maintaining aspect ratio
             img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
 
-            # Save to bytes as PNG
+            # Flatten transparency onto white at thumbnail size, not full size
+            if img.mode in ("RGBA", "LA"):
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.split()[-1])
+                img = background
+
+            # Save to bytes as PNG; fastest zlib level, since log thumbnails
+            # are tiny and max compression only costs encode time
             buffer = io.BytesIO()
-            img.save(buffer, format="PNG", optimize=True)
-            buffer.seek(0)
+            img.save(buffer, format="PNG", compress_level=1)
 
-            # Encode as base64 data URL
-            thumbnail_b64 = base64.b64encode(buffer.read()).decode("ascii")
+            # Encode as base64 data URL straight from the buffer, without a copy
+            with buffer.getbuffer() as png_view:
+                thumbnail_b64 = pybase64.b64encode_as_string(png_view)
             return f"data:image/png;base64,{thumbnail_b64}"
 
     except Exception as e:
@@ -95,6 +200,50 @@ def create_image_thumbnail(base64_data: str, max_size: int = 128) -> str:
         return ""
 
 
+def create_image_thumbnail(base64_data: str, max_size: int = 128) -> str:
+    """
+    Create a thumbnail from base64 image data.
+
+    Args:
+        base64_data: Base64-encoded image data (without data URL prefix).
+        max_size: Maximum dimension (width or height) of the thumbnail.
+
+    Returns:
+        Base64-encoded thumbnail as a data URL.
+    """
+    base64_data = _normalize_base64(base64_data)
+
+    try:
+        image_bytes = _decode_base64(base64_data)
+    except Exception as e:
+        logger.warning("Failed to create thumbnail: %s", e)
+        return ""
+
+    return _create_image_thumbnail_bytes(image_bytes, max_size)
+
+
+def _get_image_metadata_bytes(image_bytes: bytes, mime_type: str) -> ImageMetadata:
+    """Extract metadata from already-decoded image bytes."""
+    dimensions = _peek_dimensions(image_bytes)
+    if dimensions:
+        width, height = dimensions
+    else:
+        try:
+            # Unknown format - open image with PIL to get dimensions
+            with Image.open(io.BytesIO(image_bytes)) as img:
+                width, height = img.size
+        except Exception as e:
+            logger.warning("Failed to get image metadata: %s", e)
+            width = height = 0
+
+    return ImageMetadata(
+        width=width,
+        height=height,
+        sizeBytes=len(image_bytes),
+        mimeType=mime_type,
+    )
+
+
 def get_image_metadata(base64_data: str, mime_type: str = "image/png") -> ImageMetadata:
     """
     Extract metadata from base64 image data.
@@ -106,32 +255,40 @@ def get_image_metadata(base64_data: str, mime_type: str = "image/png") -> ImageM
     Returns:
         Dictionary with width, height, sizeBytes, and mimeType.
     """
-    try:
-        # Decode base64 to bytes
-        image_bytes = base64.b64decode(base64_data)
-        size_bytes = len(image_bytes)
-
-        # Open image with PIL to get dimensions
-        with Image.open(io.BytesIO(image_bytes)) as img:
-            width, height = img.size
-
-        return ImageMetadata(
-            width=width,
-            height=height,
-            sizeBytes=size_bytes,
-            mimeType=mime_type,
-        )
+    base64_data = _normalize_base64(base64_data)
+
+    # PNG and JPEG sizes are in the first few hundred bytes, so try those
+    # before decoding a potentially multi-megabyte payload
+    if len(base64_data) > _HEADER_PEEK_LEN:
+        try:
+            dimensions = _peek_dimensions(
+                pybase64.b64decode(base64_data[:_HEADER_PEEK_LEN], validate=True)
+            )
+        except Exception:
+            dimensions = None
+        if dimensions:
+            width, height = dimensions
+            return ImageMetadata(
+                width=width,
+                height=height,
+                sizeBytes=_decoded_size(base64_data),
+                mimeType=mime_type,
+            )
 
+    try:
+        image_bytes = _decode_base64(base64_data)
     except Exception as e:
         logger.warning("Failed to get image metadata: %s", e)
-        # Return defaults on error
+        # Return defaults on error; the size is estimated since decoding failed
         return ImageMetadata(
             width=0,
             height=0,
-            sizeBytes=len(base64.b64decode(base64_data)) if base64_data else 0,
+            sizeBytes=_decoded_size(base64_data),
             mimeType=mime_type,
         )
 
+    return _get_image_metadata_bytes(image_bytes, mime_type)
+
 
 def format_image_for_log(data_url: str, max_thumbnail_size: int = 128) -> ImageLogData:
     """
@@ -145,14 +302,19 @@ def format_image_for_log(data_url: str, max_thumbnail_size: int = 128) -> ImageL
         Dictionary with thumbnail, width, height, sizeBytes, and mimeType.
     """
     # Extract base64 data and mime type
-    base64_data = extract_base64_data(data_url)
-    mime_type = extract_mime_type(data_url)
+    mime_type, base64_data = split_data_url(data_url)
+    base64_data = _normalize_base64(base64_data)
 
-    # Get metadata
-    metadata = get_image_metadata(base64_data, mime_type)
-
-    # Create thumbnail
-    thumbnail = create_image_thumbnail(base64_data, max_thumbnail_size)
+    # Decode once and share the bytes between metadata and thumbnail
+    try:
+        image_bytes = _decode_base64(base64_data)
+    except Exception:
+        # Let the public helpers log the failure and apply their fallbacks
+        metadata = get_image_metadata(base64_data, mime_type)
+        thumbnail = create_image_thumbnail(base64_data, max_thumbnail_size)
+    else:
+        metadata = _get_image_metadata_bytes(image_bytes, mime_type)
+        thumbnail = _create_image_thumbnail_bytes(image_bytes, max_thumbnail_size)
 
     return ImageLogData(
         thumbnail=thumbnail,
@@ -179,22 +341,39 @@ def log_image_inputs(
         source_image: Source image data URL (optional).
         mask_image: Mask image data URL (optional).
     """
+    # Skip decoding entirely when the record would be dropped anyway
+    if not logger_instance.isEnabledFor(logging.INFO):
+        return
+
     image_inputs: dict[str, ImageMetadata] = {}
 
     if source_image:
-        base64_data = extract_base64_data(source_image)
-        mime_type = extract_mime_type(source_image)
+        mime_type, base64_data = split_data_url(source_image)
         image_inputs["sourceImage"] = get_image_metadata(base64_data, mime_type)
 
     if mask_image:
-        base64_data = extract_base64_data(mask_image)
-        mime_type = extract_mime_type(mask_image)
+        mime_type, base64_data = split_data_url(mask_image)
         image_inputs["maskImage"] = get_image_metadata(base64_data, mime_type)
 
     if image_inputs:
         logger_instance.info("Image inputs: %s", image_inputs)
 
 
+def _extract_images_from_dicts(contents: list[dict]) -> list[tuple[str, str]]:
+    """Extract images from contents made only of dicts, without type checks."""
+    images: list[tuple[str, str]] = []
+
+    for content in contents:
+        for part in content.get("parts") or ():
+            inline_data = part.get("inline_data")
+            if inline_data:
+                data = inline_data.get("data", "")
+                if data:
+                    images.append((inline_data.get("mime_type", "image/png"), data))
+
+    return images
+
+
 def extract_images_from_contents(contents: list) -> list[tuple[str, str]]:
     """
     Extract images from Gemini API contents structure.
@@ -207,6 +386,14 @@ def extract_images_from_contents(contents: list) -> list[tuple[str, str]]:
     Returns:
         List of (mime_type, base64_data) tuples for each image found.
     """
+    # Request bodies arrive as plain JSON, so try the dict-only walk first
+    # and fall back to the per-part type checks for SDK objects or mixes
+    if contents and isinstance(contents[0], dict):
+        try:
+            return _extract_images_from_dicts(contents)
+        except AttributeError:
+            pass
+
     images: list[tuple[str, str]] = []
 
     for content in contents:
@@ -253,6 +440,9 @@ def log_contents_images(
         logger_instance: Logger to use for output.
         contents: List of content objects from API request.
     """
+    if not logger_instance.isEnabledFor(logging.INFO):
+        return
+
     images = extract_images_from_contents(contents)
 
     if not images:
@@ -7,10 +7,26 @@ Formats events to match the Express server's SSE format exactly:
 - event: error, data: { message: string, details?: string } (JSON)
 """
 
-import json
-from typing import Any
+import asyncio
+from typing import Any, AsyncGenerator, AsyncIterable
+
+import orjson
 
 from schemas.agentic import AIProgressEvent, AgenticEditResponse
+from utils.orjson_response import orjson_default
+
+
+def _encode(data: Any) -> str:
+    """Encode an SSE data payload as compact JSON."""
+    if hasattr(data, "model_dump"):
+        # Pydantic model - exclude None values for smaller payloads. Dumping
+        # to a dict and encoding with orjson beats model_dump_json on frames
+        # carrying base64 iteration images.
+        data = data.model_dump(mode="json", exclude_none=True)
+
+    # orjson handles raw bytes from graph stream payloads via orjson_default
+    # and is much faster than json.dumps on large frames
+    return orjson.dumps(data, default=orjson_default).decode()
 
 
 def format_sse_event(event_type: str, data: Any) -> str:
@@ -23,23 +39,24 @@ def format_sse_event(event_type: str, data: Any) -> str:
 
     (blank line to end event)
     """
-    if hasattr(data, "model_dump"):
-        # Pydantic model - serialize excluding None values for smaller payloads
-        json_data = data.model_dump_json(exclude_none=True)
-    else:
-        json_data = json.dumps(data)
+    return f"event: {event_type}\ndata: {_encode(data)}\n\n"
+
 
-    return f"event: {event_type}\ndata: {json_data}\n\n"
+# Framing for the fixed event types, built once instead of per event
+_PROGRESS_PREFIX = "event: progress\ndata: "
+_COMPLETE_PREFIX = "event: complete\ndata: "
+_ERROR_PREFIX = "event: error\ndata: "
+_SUFFIX = "\n\n"
 
 
 def format_progress_event(event: AIProgressEvent) -> str:
     """Format a progress event for SSE streaming."""
-    return format_sse_event("progress", event)
+    return _PROGRESS_PREFIX + _encode(event) + _SUFFIX
 
 
 def format_complete_event(response: AgenticEditResponse) -> str:
     """Format a completion event for SSE streaming."""
-    return format_sse_event("complete", response)
+    return _COMPLETE_PREFIX + _encode(response) + _SUFFIX
 
 
 def format_error_event(message: str, details: str | None = None) -> str:
@@ -47,4 +64,76 @@ def format_error_event(message: str, details: str | None = None) -> str:
     error_data = {"message": message}
     if details:
         error_data["details"] = details
-    return format_sse_event("error", error_data)
+    return _ERROR_PREFIX + _encode(error_data) + _SUFFIX
+
+
+# Frames that end a stream are sent as soon as they are produced
+_FLUSH_IMMEDIATELY = (_COMPLETE_PREFIX, _ERROR_PREFIX)
+
+
+async def coalesce_sse_events(
+    events: AsyncIterable[str],
+    max_events: int = 8,
+    max_delay: float = 0.005,
+) -> AsyncGenerator[str, None]:
+    """
+    Batch SSE frames that arrive close together into a single chunk.
+
+    Each yielded chunk becomes one HTTP write, so bursts of progress frames
+    cost one send instead of one per frame. A batch is flushed when it holds
+    max_events frames, when max_delay seconds pass after its first frame
+    without it filling, or when a complete/error frame arrives. A slow step
+    therefore never holds back progress the client has not seen yet.
+
+    If the upstream raises, buffered frames are sent before the error
+    propagates. The upstream is closed as soon as this generator is closed.
+    """
+    iterator = aiter(events)
+    loop = asyncio.get_running_loop()
+    buffer: list[str] = []
+    deadline = 0.0
+    pending: asyncio.Future[str] | None = None
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(iterator))
+            if buffer:
+                done, _ = await asyncio.wait({pending}, timeout=max(deadline - loop.time(), 0))
+                if not done:
+                    yield "".join(buffer)
+                    buffer.clear()
+                    continue
+            try:
+                event = await pending
+            except StopAsyncIteration:
+                break
+            except Exception:
+                # Deliver the frames produced before the failure, then re-raise
+                if buffer:
+                    yield "".join(buffer)
+                    buffer.clear()
+                raise
+            finally:
+                pending = None
+
+            if not buffer:
+                deadline = loop.time() + max_delay
+            buffer.append(event)
+            if len(buffer) >= max_events or event.startswith(_FLUSH_IMMEDIATELY):
+                yield "".join(buffer)
+                buffer.clear()
+    finally:
+        # On early exit (client disconnect, consumer stopped), stop the
+        # in-flight read and finalize the upstream generator right away
+        if pending is not None:
+            pending.cancel()
+            await asyncio.wait({pending})
+            if not pending.cancelled():
+                pending.exception()  # already finished; mark it retrieved
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+    if buffer:
+        yield "".join(buffer)